@@ -0,0 +1,59 @@
+"""Compare bulk BTP7 decoding with the per-frame decoder.
+
+    python -m benchmarks.bulk [--frames 1000000]
+
+Checks that both give the same values and prints frames per second.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from custom_components.garnet.bulk import decode_btp7
+from custom_components.garnet.frames import BTP7
+
+
+def main() -> None:
+    """Decode random frames both ways, verify and time them."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(args.frames, BTP7.length), dtype=np.uint8)
+    frames[:, 3:9][rng.random((args.frames, 6)) < 0.1] = 110
+    buffer = frames.tobytes()
+
+    start = time.perf_counter()
+    columns = decode_btp7(buffer)
+    bulk_time = time.perf_counter() - start
+
+    length = BTP7.length
+    start = time.perf_counter()
+    decoded = [
+        BTP7.decode(buffer[offset : offset + length])
+        for offset in range(0, len(buffer), length)
+    ]
+    frame_time = time.perf_counter() - start
+
+    for row, (coach_id, readings) in enumerate(decoded):
+        assert columns["coach_id"][row] == coach_id
+        for channel, value in readings:
+            column = columns[channel.key]
+            if value is None:
+                assert np.ma.is_masked(column[row]), (row, channel.key)
+            else:
+                assert column[row] == value, (row, channel.key)
+
+    print(
+        f"{args.frames:,} frames, results match: "
+        f"bulk {args.frames / bulk_time:,.0f} frames/s, "
+        f"per-frame {args.frames / frame_time:,.0f} frames/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
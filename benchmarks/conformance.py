@@ -0,0 +1,190 @@
+"""Conformance checks for every registered frame spec.
+
+    python -m benchmarks.conformance [--frames 20000] [--budget-ns 20000]
+
+A spec conforms when
+- each of its channels has a value slot and a sensor description,
+- its known frames in VECTORS decode to the expected coach id and values,
+- multiplexed specs read every ASCII value field the way the original
+  ``int()`` decoder did,
+- random payloads of its length decode without raising, to the coach id
+  ``coach_id()`` reads, the channels ``heard_channels()`` lists and to
+  int, float or None values,
+- the median time to find and run its decoder stays within the budget.
+
+Adding a model means registering its spec in ``frames.py`` and adding at
+least one captured frame for it to VECTORS. The script prints a row per
+spec and exits non-zero if any check fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+from itertools import product
+import random
+import statistics
+import sys
+import time
+
+from custom_components.garnet.frames import (
+    NUMBER_CHARACTERS,
+    REGISTRY,
+    FrameSpec,
+    MultiplexedFrameSpec,
+)
+from custom_components.garnet.readings import SLOT_INDEX
+from custom_components.garnet.sensor import SENSOR_DESCRIPTIONS
+
+# Captured frames per model with their coach id and decoded values
+VECTORS: dict[str, list[tuple[bytes, int, dict[str, int | float | None]]]] = {
+    "709-BTP3": [
+        (bytes.fromhex("3412000020363720202020202000"), 0x1234, {"fresh_tank": 67}),
+        (bytes.fromhex("341200024f504e20202020202000"), 0x1234, {"grey_tank": None}),
+        (bytes.fromhex("3412000d31323820202020202000"), 0x1234, {"battery": 12.8}),
+        (
+            bytes.fromhex("3412010020353020343031303000"),
+            0x11234,
+            {"fresh_tank": 50, "fresh_tank_volume": 40, "fresh_tank_total": 100},
+        ),
+        (bytes.fromhex("341200ff202020202020202020ff"), 0x1234, {}),
+    ],
+    "709-BTP7": [
+        (
+            bytes.fromhex("3412004221106e46170066847f00"),
+            0x1234,
+            {
+                "fresh_tank": 66,
+                "grey_tank": 33,
+                "black_tank": 16,
+                "fresh_tank2": None,
+                "grey_tank2": 70,
+                "black_tank2": 23,
+                "lpg_tank": None,
+                "battery": 13.2,
+            },
+        ),
+    ],
+}
+
+
+def check_channels(spec: FrameSpec) -> list[str]:
+    """Return the channels of a spec lacking a slot or a description."""
+    failures = []
+    for channel in spec.channels:
+        if channel is None:
+            continue
+        keys = [channel.key]
+        if channel.unit == "%" and isinstance(spec, MultiplexedFrameSpec):
+            keys += [f"{channel.key}_volume", f"{channel.key}_total"]
+        failures.extend(
+            f"{key} has no slot or description"
+            for key in keys
+            if key not in SLOT_INDEX or key not in SENSOR_DESCRIPTIONS
+        )
+    return failures
+
+
+def check_vectors(spec: FrameSpec) -> list[str]:
+    """Return the known frames of a spec that decode wrongly."""
+    if not (vectors := VECTORS.get(spec.model)):
+        return ["no known frames in VECTORS"]
+    failures = []
+    for payload, coach_id, expected in vectors:
+        if REGISTRY.get(spec.manufacturer_id, payload) is not spec:
+            failures.append(f"{payload.hex()} is not dispatched to this spec")
+            continue
+        decoded_coach, readings = spec.decode(payload)
+        decoded = {channel.key: value for channel, value in readings}
+        if decoded_coach != coach_id or decoded != expected:
+            failures.append(f"{payload.hex()} decoded to {decoded_coach} {decoded}")
+    return failures
+
+
+def baseline_number(field: bytes) -> int | None:
+    """Return a value field as the original decoder read it, None if invalid."""
+    try:
+        return int(field.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def check_numbers(spec: FrameSpec) -> list[str]:
+    """Return value fields a multiplexed spec reads unlike the original decoder.
+
+    Fields are built from every character int() accepts and a few it does not.
+    """
+    if not isinstance(spec, MultiplexedFrameSpec):
+        return []
+    alphabet = NUMBER_CHARACTERS + b"OPNBx."
+    return [
+        f"{field!r} read as {spec.numbers.get(field)}, not {expected}"
+        for field in map(bytes, product(alphabet, repeat=3))
+        if spec.numbers.get(field) != (expected := baseline_number(field))
+    ][:5]
+
+
+def check_random(spec: FrameSpec, payloads: list[bytes]) -> list[str]:
+    """Return problems decoding random payloads of the spec's length."""
+    for payload in payloads:
+        try:
+            coach_id, readings = spec.decode(payload)
+        except Exception as err:  # noqa: BLE001
+            return [f"{payload.hex()} raised {err!r}"]
+        if coach_id != spec.coach_id(payload):
+            return [f"{payload.hex()} coach id differs from coach_id()"]
+        if not {channel for channel, _ in readings} >= set(
+            spec.heard_channels(payload)
+        ):
+            return [f"{payload.hex()} heard_channels() differs from decode()"]
+        for _, value in readings:
+            if value is not None and type(value) not in (int, float):
+                return [f"{payload.hex()} decoded to {value!r}"]
+    return []
+
+
+def dispatch_time(spec: FrameSpec, payloads: list[bytes]) -> float:
+    """Return the median ns to find and run the decoder of a payload."""
+    manufacturer_id = spec.manufacturer_id
+    get = REGISTRY.get
+    times = []
+    for payload in payloads:
+        started = time.perf_counter_ns()
+        get(manufacturer_id, payload).decode(payload)
+        times.append(time.perf_counter_ns() - started)
+    return statistics.median(times)
+
+
+def main() -> None:
+    """Check every registered spec and print a row per spec."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--budget-ns", type=float, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failed = False
+    print(f"{'model':<12}{'mfr id':>8}{'length':>8}{'ns/frame':>12}  result")
+    for spec in REGISTRY:
+        payloads = [rng.randbytes(spec.length) for _ in range(args.frames)]
+        failures = [
+            *check_channels(spec),
+            *check_vectors(spec),
+            *check_numbers(spec),
+            *check_random(spec, payloads),
+        ]
+        elapsed = dispatch_time(spec, payloads)
+        if elapsed > args.budget_ns:
+            failures.append(f"over the {args.budget_ns:,.0f} ns budget")
+        failed = failed or bool(failures)
+        print(
+            f"{spec.model:<12}{spec.manufacturer_id:>#8x}{spec.length:>8}"
+            f"{elapsed:>12,.0f}  {'FAIL' if failures else 'ok'}"
+        )
+        for failure in failures:
+            print(f"    {failure}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Microbenchmark of the frame decoders.
+
+Compares the table driven specs in ``frames.py`` with the if-chain decoders
+they replaced. Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.decode
+"""
+
+from __future__ import annotations
+
+from struct import unpack
+import timeit
+
+from custom_components.garnet.frames import BTP3, BTP7
+
+BTP3_FRAMES = (
+    bytes.fromhex("3412000020363720202020202000"),  # fresh 67 %
+    bytes.fromhex("341200024f504e20202020202000"),  # grey OPN
+    bytes.fromhex("3412000d31323820202020202000"),  # battery 12.8 V
+)
+BTP7_FRAMES = (bytes.fromhex("3412004221106e46170066847f00"),)
+
+
+def legacy_sensor_name(sensor_type: int) -> str:
+    """Map a BTP3 sensor type to its key the way the old parser did."""
+    if sensor_type == 0:
+        return "fresh_tank"
+    if sensor_type == 1:
+        return "black_tank"
+    if sensor_type == 2:
+        return "grey_tank"
+    if sensor_type == 3:
+        return "lpg_tank"
+    if sensor_type == 4:
+        return "lpg_2_tank"
+    if sensor_type == 5:
+        return "galley_tank"
+    if sensor_type == 6:
+        return "galley_2_tank"
+    if sensor_type == 7:
+        return "temp"
+    if sensor_type == 8:
+        return "temp_2"
+    if sensor_type == 9:
+        return "temp_3"
+    if sensor_type == 10:
+        return "temp_4"
+    if sensor_type == 11:
+        return "chemical_tank"
+    if sensor_type == 12:
+        return "chemical_2_tank"
+    if sensor_type == 13:
+        return "battery"
+    return f"unknown_{sensor_type}"
+
+
+def legacy_btp3(data: bytes) -> list[tuple]:
+    """Decode a BTP3 frame the way the old parser did."""
+    (coach_id, sensor_type, sensor_value, sensor_volume, sensor_total, alarm) = (
+        unpack("@3sc3s3s3sc", data)
+    )
+    coach_id = int.from_bytes(coach_id, byteorder="little")
+    sensor_type = int.from_bytes(sensor_type, byteorder="little")
+    sensor_value = sensor_value.decode("utf-8")
+    sensor_measurement_unit = "%"
+    sensor_available = sensor_value not in ("OPN", "NBO")
+    if sensor_type == 255:
+        return []
+    if sensor_available:
+        try:
+            sensor_value = int(sensor_value)
+        except Exception:  # noqa: BLE001
+            sensor_available = False
+    sensor_device_class = None
+    if sensor_type == 13 and sensor_available:
+        sensor_value = round(sensor_value / 10, 2)
+        sensor_measurement_unit = "V"
+        sensor_device_class = "VOLTAGE"
+    if 6 < sensor_type < 11:
+        sensor_measurement_unit = "DEGREE"
+        sensor_device_class = "TEMPERATURE"
+    key = legacy_sensor_name(sensor_type)
+    return [
+        (
+            key,
+            sensor_measurement_unit,
+            sensor_value if sensor_available else None,
+            sensor_device_class,
+        )
+    ]
+
+
+def legacy_btp7(data: bytes) -> list[tuple]:
+    """Decode a BTP7 frame the way the old parser did."""
+    (
+        coach_id,
+        fresh_1,
+        grey_1,
+        black_1,
+        fresh_2,
+        grey_2,
+        black_2,
+        unk_4,
+        lpg_1,
+        voltage,
+        unk_6,
+        unk_7,
+    ) = unpack("<HxBBBBBBBBBBB", data)
+    return [
+        ("grey_tank", "%", grey_1 if (grey_1 not in {110, 102}) else None),
+        ("grey_tank2", "%", grey_2 if (grey_2 not in {110, 102}) else None),
+        ("fresh_tank", "%", fresh_1 if (fresh_1 not in {110, 102}) else None),
+        ("fresh_tank2", "%", fresh_2 if (fresh_2 not in {110, 102}) else None),
+        ("black_tank", "%", black_1 if (black_1 not in {110, 102}) else None),
+        ("black_tank2", "%", black_2 if (black_2 not in {110, 102}) else None),
+        ("battery", "V", round(voltage / 10, 2), "VOLTAGE"),
+        ("lpg_tank", "%", lpg_1 if (lpg_1 not in {110, 102}) else None),
+    ]
+
+
+def frames_per_second(decode, frames: tuple[bytes, ...], number: int) -> float:
+    """Return how many frames per second ``decode`` handles."""
+
+    def run() -> None:
+        for frame in frames:
+            decode(frame)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return number * len(frames) / best
+
+
+def main() -> None:
+    """Print decoded frames per second before and after."""
+    number = 20000
+    for name, frames, legacy, spec in (
+        ("BTP3", BTP3_FRAMES, legacy_btp3, BTP3),
+        ("BTP7", BTP7_FRAMES, legacy_btp7, BTP7),
+    ):
+        before = frames_per_second(legacy, frames, number)
+        after = frames_per_second(spec.decode, frames, number)
+        print(
+            f"{name}: if-chain {before:,.0f} frames/s, "
+            f"frame spec {after:,.0f} frames/s ({after / before:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
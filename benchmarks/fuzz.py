@@ -0,0 +1,195 @@
+"""Fuzz the frame decoders and the parser with malformed advertisements.
+
+    python -m benchmarks.fuzz [--frames 20000] [--seed 0] [--budget-us 50]
+
+Every registered spec is fed frames from several generators: random bytes,
+captured frames with a few bytes changed, BTP3 frames built from awkward
+field values (non-ASCII bytes, "OPN" on the battery, unknown sensor types)
+and frames of the wrong length. Each frame is checked to
+- decode without raising, to int, float or None values,
+- go through the parser and the sensor converter without raising,
+and the 99th percentile time per frame of the parser and converter must
+stay within the budget. Prints throughput per generator and the first
+failing payload of each, and exits non-zero if any property fails.
+Generators are seeded, so a failure reproduces with the same ``--seed``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import random
+import statistics
+import sys
+import time
+
+from custom_components.garnet.capture import CaptureRecord
+from custom_components.garnet.frames import (
+    REGISTRY,
+    FrameSpec,
+    MultiplexedFrameSpec,
+)
+from custom_components.garnet.parser import GarnetBluetoothDeviceData
+from custom_components.garnet.sensor import SensorUpdateDeltaConverter
+
+from .conformance import VECTORS
+
+# Byte values that tend to sit on boundaries or break text decoding
+INTERESTING_BYTES = (0x00, 0x01, 0x20, 0x2D, 0x30, 0x39, 0x7F, 0x80, 0xFE, 0xFF)
+# Three byte BTP3 value fields, valid and not
+ASCII_FIELDS = (
+    b" 67",
+    b"100",
+    b"-05",
+    b"999",
+    b"OPN",
+    b"NBO",
+    b"   ",
+    b"\x00\x00\x00",
+    b"\xff\xfe\xfd",
+    b"1_0",
+    b" +1",
+    b"\t12",
+    b"1 2",
+)
+
+Generator = Callable[[random.Random, FrameSpec], bytes]
+
+
+def random_frame(rng: random.Random, spec: FrameSpec) -> bytes:
+    """Return random bytes of the spec's length."""
+    return rng.randbytes(spec.length)
+
+
+def mutated_frame(rng: random.Random, spec: FrameSpec) -> bytes:
+    """Return a captured frame with one to three bytes changed."""
+    payload = bytearray(rng.choice(VECTORS[spec.model])[0])
+    for _ in range(rng.randint(1, 3)):
+        payload[rng.randrange(len(payload))] = (
+            rng.choice(INTERESTING_BYTES) if rng.random() < 0.5 else rng.randrange(256)
+        )
+    return bytes(payload)
+
+
+def field_frame(rng: random.Random, spec: FrameSpec) -> bytes:
+    """Return a frame built from awkward field values.
+
+    Multiplexed frames get a sensor type that is known, unknown or the boot
+    type and value fields from ASCII_FIELDS; fixed frames get every field
+    from INTERESTING_BYTES.
+    """
+    if not isinstance(spec, MultiplexedFrameSpec):
+        return bytes(rng.choice(INTERESTING_BYTES) for _ in range(spec.length))
+    sensor_type = rng.choice(
+        (
+            rng.randrange(len(spec.channels)),
+            len(spec.channels) - 1,
+            len(spec.channels),
+            spec.boot_type,
+            rng.randrange(256),
+        )
+    )
+    payload = (
+        rng.randbytes(3)
+        + bytes((sensor_type,))
+        + b"".join(rng.choice(ASCII_FIELDS) for _ in range(3))
+    )
+    return payload + rng.randbytes(spec.length - len(payload))
+
+
+def wrong_length_frame(rng: random.Random, spec: FrameSpec) -> bytes:
+    """Return a frame a few bytes shorter or longer than the spec's."""
+    length = spec.length + rng.choice((-4, -2, -1, 1, 2, 6))
+    return rng.randbytes(max(length, 0))
+
+
+GENERATORS: dict[str, Generator] = {
+    "random": random_frame,
+    "mutated": mutated_frame,
+    "fields": field_frame,
+    "wrong-length": wrong_length_frame,
+}
+
+
+def check_decode(spec: FrameSpec, payload: bytes) -> str | None:
+    """Return why decoding a payload broke a property, None if it did not."""
+    if REGISTRY.get(spec.manufacturer_id, payload) is not spec:
+        return None
+    try:
+        _, readings = spec.decode(payload)
+    except Exception as err:  # noqa: BLE001
+        return f"decode raised {err!r}"
+    for channel, value in readings:
+        if value is not None and type(value) not in (int, float):
+            return f"{channel.key} decoded to {value!r}"
+    return None
+
+
+def run(
+    spec: FrameSpec, generator: Generator, frames: int, seed: int
+) -> tuple[dict[str, float], list[str]]:
+    """Fuzz one spec with one generator; return figures and failures."""
+    rng = random.Random(seed)
+    payloads = [generator(rng, spec) for _ in range(frames)]
+    failures = [
+        f"{payload.hex()}: {failure}"
+        for payload in payloads
+        if (failure := check_decode(spec, payload)) is not None
+    ]
+
+    infos = [
+        CaptureRecord(
+            index / 100, "AA:BB:CC:DD:EE:FF", spec.manufacturer_id, payload
+        ).to_service_info()
+        for index, payload in enumerate(payloads)
+    ]
+    device = GarnetBluetoothDeviceData()
+    converter = SensorUpdateDeltaConverter(device.values)
+    times = []
+    for info in infos:
+        started = time.perf_counter_ns()
+        try:
+            converter(device.update(info))
+        except Exception as err:  # noqa: BLE001
+            failures.append(
+                f"{info.manufacturer_data[spec.manufacturer_id].hex()}: "
+                f"parser raised {err!r}"
+            )
+        times.append(time.perf_counter_ns() - started)
+    quantiles = statistics.quantiles(times, n=100)
+    return {
+        "frames/s": len(times) / (sum(times) / 1e9),
+        "p50 us": quantiles[49] / 1e3,
+        "p99 us": quantiles[98] / 1e3,
+        "max us": max(times) / 1e3,
+    }, failures
+
+
+def main() -> None:
+    """Fuzz every registered spec with every generator and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-us", type=float, default=50)
+    args = parser.parse_args()
+
+    failed = False
+    columns = ("frames/s", "p50 us", "p99 us", "max us")
+    print(f"{'spec':<10}{'generator':<14}" + "".join(f"{c:>14}" for c in columns))
+    for spec in REGISTRY:
+        for name, generator in GENERATORS.items():
+            row, failures = run(spec, generator, args.frames, args.seed)
+            if row["p99 us"] > args.budget_us:
+                failures.append(f"p99 over the {args.budget_us:,.0f} us budget")
+            print(
+                f"{spec.model[4:]:<10}{name:<14}"
+                + "".join(f"{row[column]:>14,.2f}" for column in columns)
+            )
+            if failures:
+                failed = True
+                print(f"    {len(failures)} failures, first: {failures[0]}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Parser throughput benchmark on synthetic BTP3 and BTP7 captures.
+
+    python -m benchmarks.parser [--frames 20000] [--devices 10]
+
+Reports frames per second, per-frame latency percentiles and allocations
+for each scenario.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import random
+import statistics
+import tracemalloc
+
+from custom_components.garnet.capture import CaptureRecord
+from custom_components.garnet.const import MFR_ID_BTP3, MFR_ID_BTP7
+
+from .replay import replay
+
+
+def _address(index: int) -> str:
+    return f"AA:BB:CC:00:{index >> 8:02X}:{index & 0xFF:02X}"
+
+
+def synthetic_btp3(frames: int, devices: int, seed: int = 0) -> list[CaptureRecord]:
+    """Return BTP3 frames rotating through all sensor types per device."""
+    rng = random.Random(seed)
+    records = []
+    for count in range(frames):
+        index = count % devices
+        sensor_type = (count // devices) % 14
+        if sensor_type == 13:
+            value = f"{rng.randint(115, 140):3d}".encode()
+        elif rng.random() < 0.05:
+            value = b"OPN"
+        else:
+            value = f"{rng.randint(0, 100):3d}".encode()
+        payload = (
+            index.to_bytes(3, "little")
+            + bytes((sensor_type,))
+            + value
+            + b"   " * 2
+            + b"\x00"
+        )
+        records.append(
+            CaptureRecord(count / 100, _address(index), MFR_ID_BTP3, payload)
+        )
+    return records
+
+
+def synthetic_btp7(frames: int, devices: int, seed: int = 0) -> list[CaptureRecord]:
+    """Return BTP7 frames with changing tank levels and voltage."""
+    rng = random.Random(seed)
+    records = []
+    for count in range(frames):
+        index = count % devices
+        levels = [rng.choice((rng.randint(0, 100), 110)) for _ in range(6)]
+        payload = (
+            index.to_bytes(2, "little")
+            + b"\x00"
+            + bytes(levels)
+            + bytes((0, rng.randint(0, 100), rng.randint(115, 140), 0, 0))
+        )
+        records.append(
+            CaptureRecord(count / 100, _address(index), MFR_ID_BTP7, payload)
+        )
+    return records
+
+
+def synthetic_repeats(frames: int, devices: int, seed: int = 0) -> list[CaptureRecord]:
+    """Return BTP7 frames where every device repeats one payload."""
+    unique = synthetic_btp7(devices, devices, seed)
+    return [unique[count % devices] for count in range(frames)]
+
+
+SCENARIOS: dict[str, Callable[[int, int], list[CaptureRecord]]] = {
+    "btp3": synthetic_btp3,
+    "btp7": synthetic_btp7,
+    "btp7-repeats": synthetic_repeats,
+}
+
+
+def run_scenario(records: list[CaptureRecord]) -> dict[str, float]:
+    """Replay records and return throughput, latency and allocation figures."""
+    latencies = sorted(latency for _, latency in replay(records))
+    quantiles = statistics.quantiles(latencies, n=100)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in replay(records):
+        pass
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(
+        stat.size_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.size_diff > 0
+    )
+
+    return {
+        "frames/s": len(latencies) / (sum(latencies) / 1e9),
+        "p50 us": quantiles[49] / 1e3,
+        "p90 us": quantiles[89] / 1e3,
+        "p99 us": quantiles[98] / 1e3,
+        "retained B/frame": allocated / len(records),
+        "peak KiB": peak / 1024,
+    }
+
+
+def main() -> None:
+    """Run every scenario and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--devices", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = {
+        name: run_scenario(factory(args.frames, args.devices))
+        for name, factory in SCENARIOS.items()
+    }
+    columns = next(iter(rows.values())).keys()
+    print(f"{'scenario':<14}" + "".join(f"{column:>18}" for column in columns))
+    for name, row in rows.items():
+        print(f"{name:<14}" + "".join(f"{row[column]:>18,.2f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Replay a capture through the Garnet parser.
+
+    python -m benchmarks.replay capture.jsonl --rate 200
+
+Every address in the capture gets its own GarnetBluetoothDeviceData, the
+way each config entry does in Home Assistant.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterable, Iterator
+import time
+
+from custom_components.garnet.capture import CaptureRecord, read_capture
+from custom_components.garnet.parser import GarnetBluetoothDeviceData
+
+
+def replay(
+    records: Iterable[CaptureRecord],
+    rate: float | None = None,
+    devices: dict[str, GarnetBluetoothDeviceData] | None = None,
+) -> Iterator[tuple[CaptureRecord, int]]:
+    """Feed records to per-address parsers and yield each parse time in ns.
+
+    With ``rate`` set, frames are paced to that many per second; otherwise
+    they are fed as fast as possible. Service infos are built before the
+    clock starts so only the parser is measured.
+    """
+    if devices is None:
+        devices = {}
+    interval = 1 / rate if rate else 0.0
+    next_due = time.perf_counter()
+    for record in records:
+        service_info = record.to_service_info()
+        if (device := devices.get(record.address)) is None:
+            device = devices[record.address] = GarnetBluetoothDeviceData()
+        if interval:
+            if (delay := next_due - time.perf_counter()) > 0:
+                time.sleep(delay)
+            next_due += interval
+        start = time.perf_counter_ns()
+        device.update(service_info)
+        yield record, time.perf_counter_ns() - start
+
+
+def main() -> None:
+    """Replay a capture file and print a short summary."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("capture", help="JSON Lines capture file")
+    parser.add_argument("--rate", type=float, help="frames per second")
+    args = parser.parse_args()
+
+    with open(args.capture, encoding="utf-8") as fp:
+        latencies = [latency for _, latency in replay(read_capture(fp), args.rate)]
+    if not latencies:
+        print("Capture is empty")
+        return
+    total = sum(latencies) / 1e9
+    print(
+        f"{len(latencies)} frames, {total * 1e3:.1f} ms parsing, "
+        f"{len(latencies) / total:,.0f} frames/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
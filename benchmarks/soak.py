@@ -0,0 +1,308 @@
+"""Soak test a fleet of simulated panels through the whole integration.
+
+    python -m benchmarks.soak [--devices 200] [--hours 2] [--interval 1.0]
+
+Needs Home Assistant and pytest-homeassistant-custom-component. A test
+instance of Home Assistant sets up one config entry per simulated panel
+through ``async_setup_entry``, so every frame goes through the passive
+processor coordinator, the parser, the sensor converter and the entities.
+Bluetooth itself is replaced by a callback registry that frames are
+injected into.
+
+Panels advertise every ``interval`` seconds of simulated time. BTP3
+panels rotate through their sensor types, report OPN or NBO now and then
+and send boot frames (sensor type 255); BTP7 panels drift their levels
+and report open senders. The simulated clock drives the parser, so an
+hour of traffic takes as long as parsing it does.
+
+Every ``--sample-minutes`` of simulated time a row is printed with the
+frames and state writes since the last row, the worst time the event
+loop was blocked by one round of advertisements, the worst lag of a
+timer waiting on the loop, the heap traced by tracemalloc and the
+process RSS. At the end the allocation sites that grew most since the
+first sample are listed, in the integration and overall, to point at
+leaks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack
+import logging
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+from home_assistant_bluetooth import BluetoothServiceInfo
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from homeassistant import loader
+from homeassistant.components.bluetooth import BluetoothChange
+from homeassistant.components.bluetooth import passive_update_processor
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+
+from custom_components.garnet.const import DOMAIN, MFR_ID_BTP3, MFR_ID_BTP7
+
+# How often the lag monitor asks to be woken up (seconds)
+LAG_PROBE_INTERVAL = 0.01
+
+PATCHED_CLOCKS = (
+    "custom_components.garnet.logger.monotonic_time_coarse",
+    "custom_components.garnet.parser.monotonic_time_coarse",
+)
+
+
+class SimulatedClock:
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Init members."""
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """Return the simulated time."""
+        return self.now
+
+
+class FakeBluetooth:
+    """Stand-in for the Bluetooth callback registry."""
+
+    def __init__(self) -> None:
+        """Init members."""
+        self.callbacks: dict[str, list[Callable[..., None]]] = {}
+
+    def register(
+        self, hass: HomeAssistant, cb: Callable[..., None], matcher: Any, mode: Any
+    ) -> Callable[[], None]:
+        """Register a coordinator's callback for its address."""
+        callbacks = self.callbacks.setdefault(matcher["address"], [])
+        callbacks.append(cb)
+        return lambda: callbacks.remove(cb)
+
+    def inject(self, service_info: BluetoothServiceInfo) -> None:
+        """Hand an advertisement to the callbacks of its address."""
+        for cb in self.callbacks.get(service_info.address, ()):
+            cb(service_info, BluetoothChange.ADVERTISEMENT)
+
+
+def btp3_panel(rng: random.Random, coach: int) -> Iterator[dict[int, bytes]]:
+    """Yield the manufacturer data of a BTP3 panel's advertisements."""
+    levels = [rng.randint(0, 100) for _ in range(13)]
+    while True:
+        if rng.random() < 0.001:
+            yield {MFR_ID_BTP3: coach.to_bytes(3, "little") + b"\xff" + bytes(10)}
+        for sensor_type in range(14):
+            if sensor_type == 13:
+                value = f"{rng.randint(120, 138):3d}".encode()
+            elif rng.random() < 0.03:
+                value = rng.choice((b"OPN", b"NBO"))
+            else:
+                level = levels[sensor_type]
+                level = min(100, max(0, level + rng.choice((-1, 0, 0, 0, 1))))
+                levels[sensor_type] = level
+                value = f"{level:3d}".encode()
+            yield {
+                MFR_ID_BTP3: coach.to_bytes(3, "little")
+                + bytes((sensor_type,))
+                + value
+                + b" 40100\x00"
+            }
+
+
+def btp7_panel(rng: random.Random, coach: int) -> Iterator[dict[int, bytes]]:
+    """Yield the manufacturer data of a BTP7 panel's advertisements."""
+    levels = [rng.randint(0, 100) for _ in range(6)]
+    lpg = rng.randint(0, 100)
+    while True:
+        if rng.random() < 0.05:
+            index = rng.randrange(6)
+            levels[index] = min(100, max(0, levels[index] + rng.choice((-1, 1))))
+        tanks = [110 if rng.random() < 0.01 else level for level in levels]
+        yield {
+            MFR_ID_BTP7: coach.to_bytes(2, "little")
+            + b"\x00"
+            + bytes(tanks)
+            + bytes((0, lpg, rng.randint(125, 130), 0, 0))
+        }
+
+
+class LagMonitor:
+    """Measure how late the event loop wakes up a sleeping task."""
+
+    def __init__(self) -> None:
+        """Init members."""
+        self.worst = 0.0
+
+    async def run(self) -> None:
+        """Sleep in a loop, keeping the worst overshoot."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            lag = time.perf_counter() - started - LAG_PROBE_INTERVAL
+            self.worst = max(self.worst, lag)
+
+
+def _rss_kib() -> float:
+    """Return the resident set size in KiB, or the peak where unavailable."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def soak(args: argparse.Namespace) -> None:
+    """Run the simulation and print samples."""
+    rng = random.Random(args.seed)
+    clock = SimulatedClock()
+    bluetooth = FakeBluetooth()
+    with ExitStack() as stack:
+        for target in PATCHED_CLOCKS:
+            stack.enter_context(patch(target, clock))
+        for target, replacement in (
+            ("async_register_callback", bluetooth.register),
+            ("async_track_unavailable", lambda *args: lambda: None),
+            ("async_address_present", lambda *args: True),
+        ):
+            stack.enter_context(
+                patch(
+                    f"homeassistant.components.bluetooth.update_coordinator.{target}",
+                    replacement,
+                )
+            )
+        async with async_test_home_assistant() as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            hass.config.components.update({"bluetooth", "bluetooth_adapters"})
+            await passive_update_processor.async_setup(hass)
+
+            panels = []
+            for index in range(args.devices):
+                address = f"AA:BB:CC:00:{index >> 8:02X}:{index & 0xFF:02X}"
+                entry = MockConfigEntry(domain=DOMAIN, unique_id=address)
+                entry.add_to_hass(hass)
+                await hass.config_entries.async_setup(entry.entry_id)
+                panel = btp7_panel if index % 2 else btp3_panel
+                panels.append((address, panel(rng, index)))
+            await hass.async_block_till_done()
+
+            state_writes = 0
+
+            @callback
+            def _count_state_write(event: Event) -> None:
+                nonlocal state_writes
+                state_writes += 1
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, _count_state_write)
+            await run_rounds(hass, args, clock, bluetooth, panels, lambda: state_writes)
+            for entry in hass.config_entries.async_entries(DOMAIN):
+                await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def run_rounds(
+    hass: HomeAssistant,
+    args: argparse.Namespace,
+    clock: SimulatedClock,
+    bluetooth: FakeBluetooth,
+    panels: list[tuple[str, Iterator[dict[int, bytes]]]],
+    state_writes: Callable[[], int],
+) -> None:
+    """Send one advertisement per panel per interval and print samples."""
+    rounds = int(args.hours * 3600 / args.interval)
+    rounds_per_sample = max(1, int(args.sample_minutes * 60 / args.interval))
+    lag = LagMonitor()
+    lag_task = hass.async_create_background_task(lag.run(), "soak lag monitor")
+    tracemalloc.start(5)
+    first_snapshot = None
+    frames = writes = 0
+    worst_block = 0.0
+    columns = ("sim h", "frames", "writes", "frames/s", "max block ms")
+    columns += ("max lag ms", "heap KiB", "RSS KiB")
+    print("".join(f"{column:>14}" for column in columns))
+    sample_started = time.perf_counter()
+    for round_number in range(1, rounds + 1):
+        clock.now += args.interval
+        started = time.perf_counter()
+        for address, panel in panels:
+            bluetooth.inject(
+                BluetoothServiceInfo(
+                    name=address,
+                    address=address,
+                    rssi=-60,
+                    manufacturer_data=next(panel),
+                    service_data={},
+                    service_uuids=[],
+                    source="soak",
+                )
+            )
+        worst_block = max(worst_block, time.perf_counter() - started)
+        frames += len(panels)
+        # Let the tasks the round scheduled run, as the event loop would
+        await asyncio.sleep(0)
+        if round_number % rounds_per_sample:
+            continue
+        await hass.async_block_till_done()
+        elapsed = time.perf_counter() - sample_started
+        heap, _ = tracemalloc.get_traced_memory()
+        total_writes = state_writes()
+        row = (
+            round_number * args.interval / 3600,
+            frames,
+            total_writes - writes,
+            frames / elapsed,
+            worst_block * 1000,
+            lag.worst * 1000,
+            heap / 1024,
+            _rss_kib(),
+        )
+        print("".join(f"{value:>14,.2f}" for value in row))
+        if first_snapshot is None:
+            first_snapshot = tracemalloc.take_snapshot()
+        frames, writes, worst_block, lag.worst = 0, total_writes, 0.0, 0.0
+        sample_started = time.perf_counter()
+    lag_task.cancel()
+    if first_snapshot is not None:
+        last_snapshot = tracemalloc.take_snapshot()
+        integration = (tracemalloc.Filter(True, "*custom_components/garnet/*"),)
+        for title, filters in (("the integration", integration), ("overall", ())):
+            print(f"\nLargest growth since the first sample, {title}:")
+            growth = last_snapshot.filter_traces(filters).compare_to(
+                first_snapshot.filter_traces(filters), "lineno"
+            )
+            for stat in growth[: args.top]:
+                print(f"  {stat}")
+    tracemalloc.stop()
+
+
+def main() -> None:
+    """Parse arguments and run the soak test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--sample-minutes", type=float, default=15)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Keep per-entity warnings of Home Assistant from flooding the output
+    logging.getLogger("homeassistant").setLevel(logging.ERROR)
+    import custom_components  # noqa: PLC0415
+
+    # The harness ships its own custom_components; make ours importable too
+    if (root := sys.path[0] + "/custom_components") not in custom_components.__path__:
+        custom_components.__path__.append(root)
+    asyncio.run(soak(args))
+
+
+if __name__ == "__main__":
+    main()
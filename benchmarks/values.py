@@ -0,0 +1,132 @@
+"""Compare the value store path with publishing every value as a SensorUpdate.
+
+    python -m benchmarks.values [--frames 20000] [--devices 10]
+
+Both paths run the real parser and the sensor platform's converter. The
+SensorUpdate path sends every value through update_sensor and builds a
+SensorUpdate per update, the way the parser did before the value store.
+Reports time per frame, young generation garbage collections (a proxy for
+container allocations), the tracemalloc peak and memory retained per frame.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import gc
+import time
+import tracemalloc
+
+from home_assistant_bluetooth import BluetoothServiceInfo
+from sensor_state_data import SensorUpdate  # type: ignore  # noqa: PGH003
+
+from custom_components.garnet.capture import CaptureRecord
+from custom_components.garnet.parser import GarnetBluetoothDeviceData
+from custom_components.garnet.sensor import SensorUpdateDeltaConverter
+
+from .parser import SCENARIOS
+
+
+class SensorUpdateParser(GarnetBluetoothDeviceData):
+    """Parser publishing every value through update_sensor."""
+
+    def _set_value(
+        self,
+        key: str,
+        native_unit_of_measurement: str | None,
+        native_value: int | float | None,
+        device_class: str | None = None,
+    ) -> None:
+        self.update_sensor(
+            key=key,
+            native_unit_of_measurement=native_unit_of_measurement,
+            native_value=native_value,
+            device_class=device_class,
+        )
+
+    def _set_signal_strength(self, rssi: int) -> None:
+        self.update_signal_strength(rssi)
+
+    def _build_update(self) -> SensorUpdate:
+        return self._finish_update()
+
+
+def _pipeline(
+    factory: Callable[[], GarnetBluetoothDeviceData],
+) -> Callable[[BluetoothServiceInfo], object]:
+    """Return a function feeding one advertisement through parser and converter."""
+    pipelines: dict[str, Callable[[BluetoothServiceInfo], object]] = {}
+
+    def feed(info: BluetoothServiceInfo) -> object:
+        if (pipeline := pipelines.get(info.address)) is None:
+            device = factory()
+            converter = SensorUpdateDeltaConverter(device.values)
+
+            def pipeline(info: BluetoothServiceInfo) -> object:
+                return converter(device.update(info))
+
+            pipelines[info.address] = pipeline
+        return pipeline(info)
+
+    return feed
+
+
+def run_path(
+    factory: Callable[[], GarnetBluetoothDeviceData], records: list[CaptureRecord]
+) -> dict[str, float]:
+    """Feed records through one path and return its figures."""
+    infos = [record.to_service_info() for record in records]
+    # Warm up with the first frame of every device so descriptions are sent
+    feed = _pipeline(factory)
+    for info in infos[: len({record.address for record in records})]:
+        feed(info)
+
+    gc.collect()
+    collections = gc.get_stats()[0]["collections"]
+    started = time.perf_counter_ns()
+    for info in infos:
+        feed(info)
+    elapsed = time.perf_counter_ns() - started
+    collections = gc.get_stats()[0]["collections"] - collections
+
+    feed = _pipeline(factory)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for info in infos:
+        feed(info)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained = sum(
+        stat.size_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.size_diff > 0
+    )
+    return {
+        "ns/frame": elapsed / len(records),
+        "gen0 GCs/10k": collections * 10000 / len(records),
+        "peak KiB": peak / 1024,
+        "retained B/frame": retained / len(records),
+    }
+
+
+def main() -> None:
+    """Run both paths for every scenario and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--devices", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = {}
+    for name, scenario in SCENARIOS.items():
+        records = scenario(args.frames, args.devices)
+        rows[f"{name} update"] = run_path(SensorUpdateParser, records)
+        rows[f"{name} store"] = run_path(GarnetBluetoothDeviceData, records)
+    columns = next(iter(rows.values())).keys()
+    print(f"{'path':<20}" + "".join(f"{column:>18}" for column in columns))
+    for name, row in rows.items():
+        print(f"{name:<20}" + "".join(f"{row[column]:>18,.2f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
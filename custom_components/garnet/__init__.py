@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import partial
 import logging
 
 from homeassistant.components.bluetooth import BluetoothScanningMode
@@ -11,39 +12,158 @@ from homeassistant.components.bluetooth.passive_update_processor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .aggregates import StatisticsAggregator
+from .calibration import VolumeCalibration
+from .coach import CoachRouter
+from .const import (
+    CONF_CALIBRATION,
+    CONF_COALESCE_ROTATION,
+    CONF_COALESCE_WINDOW,
+    CONF_DERIVED_RATES,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_MERGE_COACHES,
+    CONF_MIN_INTERVAL,
+    CONF_RATE_WINDOW,
+    CONF_RECORD_RAW,
+    CONF_VOLUME_UNIT,
+    DATA_COACH_ROUTER,
+    DATA_STALE_TRACKER,
+    DEFAULT_CALIBRATION,
+    DEFAULT_COALESCE_ROTATION,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_DERIVED_RATES,
+    DEFAULT_EXTERNAL_STATISTICS,
+    DEFAULT_MERGE_COACHES,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_RATE_WINDOW,
+    DEFAULT_RECORD_RAW,
+    DEFAULT_VOLUME_UNIT,
+    DOMAIN,
+    RECORDER_SLOTS,
+    STATISTICS_BUCKET,
+)
+from .models import GarnetData
 from .parser import GarnetBluetoothDeviceData
+from .rates import RateTracker
+from .recorder import RawRecorder
+from .services import async_setup_services
+from .stale import StaleTracker, channel_expiries
+from .statistics import StatisticsWriter
+from .throttle import PublishThrottle
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Garnet integration."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Garnet BLE device from a config entry."""
     address = entry.unique_id
     assert address is not None
-    data = GarnetBluetoothDeviceData()
-    coordinator = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = (
-        PassiveBluetoothProcessorCoordinator(
-            hass,
-            _LOGGER,
-            address=address,
-            mode=BluetoothScanningMode.PASSIVE,
-            update_method=data.update,
+    recorder = None
+    if entry.options.get(CONF_RECORD_RAW, DEFAULT_RECORD_RAW):
+        recorder = await hass.async_add_executor_job(
+            RawRecorder.open,
+            hass.config.path(f"garnet_{address.replace(':', '').lower()}.ring"),
+            RECORDER_SLOTS,
+        )
+    coaches: CoachRouter | None = None
+    if entry.options.get(CONF_MERGE_COACHES, DEFAULT_MERGE_COACHES):
+        coaches = hass.data.setdefault(DATA_COACH_ROUTER, CoachRouter())
+    coalesce_window: float | None = None
+    if entry.options.get(CONF_COALESCE_ROTATION, DEFAULT_COALESCE_ROTATION):
+        coalesce_window = entry.options.get(
+            CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
         )
+    rates: RateTracker | None = None
+    if entry.options.get(CONF_DERIVED_RATES, DEFAULT_DERIVED_RATES):
+        rates = RateTracker(entry.options.get(CONF_RATE_WINDOW, DEFAULT_RATE_WINDOW))
+    calibration = VolumeCalibration.from_text(
+        entry.options.get(CONF_CALIBRATION, DEFAULT_CALIBRATION),
+        entry.options.get(CONF_VOLUME_UNIT, DEFAULT_VOLUME_UNIT),
+    )
+    statistics: StatisticsAggregator | None = None
+    throttle_options = entry.options
+    if entry.options.get(CONF_EXTERNAL_STATISTICS, DEFAULT_EXTERNAL_STATISTICS):
+        if "recorder" in hass.config.components:
+            statistics = StatisticsAggregator()
+            # Statistics see every reading, so states are only written now and then
+            throttle_options = {
+                **entry.options,
+                CONF_MIN_INTERVAL: max(
+                    entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                    STATISTICS_BUCKET,
+                ),
+            }
+        else:
+            _LOGGER.warning(
+                "External statistics for %s need the recorder, which is not loaded",
+                entry.title,
+            )
+    data = GarnetBluetoothDeviceData(
+        PublishThrottle.from_options(throttle_options),
+        recorder,
+        coaches,
+        coalesce_window,
+        rates,
+        calibration,
+        statistics,
     )
+    coordinator = PassiveBluetoothProcessorCoordinator(
+        hass,
+        _LOGGER,
+        address=address,
+        mode=BluetoothScanningMode.PASSIVE,
+        update_method=data.update,
+    )
+    garnet_data = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = GarnetData(
+        coordinator, data, recorder
+    )
+    data.push = garnet_data.async_push
+    if coaches is not None:
+        coaches.register(data, entry.created_at.timestamp())
+        data.on_hand_over = garnet_data.async_set_handed_over
+        entry.async_on_unload(lambda: coaches.unregister(data))
+    if expiries := channel_expiries(entry.options):
+        tracker: StaleTracker = hass.data.setdefault(
+            DATA_STALE_TRACKER, StaleTracker(hass)
+        )
+        entry.async_on_unload(
+            tracker.register(entry.entry_id, expiries, garnet_data.async_set_stale)
+        )
+        data.seen = partial(tracker.touch, entry.entry_id)
+    if statistics is not None:
+        writer = StatisticsWriter(hass, statistics, address, entry.title)
+        entry.async_on_unload(writer.async_start())
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(
         coordinator.async_start()
     )  # only start after all platforms have had a chance to subscribe
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        garnet_data: GarnetData = hass.data[DOMAIN].pop(entry.entry_id)
+        if garnet_data.recorder is not None:
+            await hass.async_add_executor_job(garnet_data.recorder.close)
 
     return unload_ok
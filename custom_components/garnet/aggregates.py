@@ -0,0 +1,117 @@
+"""Five minute and hourly aggregates of channel readings.
+
+Every reading is folded into the running bucket of its slot: a count, a
+sum, a minimum and a maximum in flat preallocated arrays. Closed buckets
+are folded into the hour the same way, and closed hours are queued as
+rows for the long-term statistics. Memory use is fixed whatever the
+advertisement rate.
+"""
+
+from __future__ import annotations
+
+from array import array
+import math
+
+from .const import STATISTICS_BUCKET, GarnetTypes
+
+HOUR = 3600
+
+# Hour start, slot, mean, minimum and maximum of one closed hour
+HourRow = tuple[float, int, float, float, float]
+
+
+class Aggregate:
+    """Count, sum, minimum and maximum of every slot."""
+
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self, size: int) -> None:
+        """Init members."""
+        self.clear(size)
+
+    def add(self, index: int, value: float) -> None:
+        """Add one reading to a slot."""
+        self.count[index] += 1
+        self.total[index] += value
+        if value < self.minimum[index]:
+            self.minimum[index] = value
+        if value > self.maximum[index]:
+            self.maximum[index] = value
+
+    def merge(self, other: Aggregate) -> None:
+        """Add every slot of another aggregate to this one."""
+        for index, count in enumerate(other.count):
+            if count:
+                self.count[index] += count
+                self.total[index] += other.total[index]
+                self.minimum[index] = min(self.minimum[index], other.minimum[index])
+                self.maximum[index] = max(self.maximum[index], other.maximum[index])
+
+    def clear(self, size: int | None = None) -> None:
+        """Forget all readings."""
+        if size is None:
+            size = len(self.count)
+        self.count = array("L", [0]) * size
+        self.total = array("d", [0.0]) * size
+        self.minimum = array("d", [math.inf]) * size
+        self.maximum = array("d", [-math.inf]) * size
+
+
+class StatisticsAggregator:
+    """Aggregate readings of the Garnet sensor types per bucket and hour.
+
+    Slots are the GarnetTypes ordinals, the first slots of the value store.
+    Times are UNIX timestamps, so buckets and hours line up with UTC.
+    """
+
+    __slots__ = ("bucket", "hour", "bucket_start", "hour_start", "closed")
+
+    def __init__(self, size: int = len(GarnetTypes)) -> None:
+        """Init members."""
+        self.bucket = Aggregate(size)
+        self.hour = Aggregate(size)
+        self.bucket_start = 0.0
+        self.hour_start = 0.0
+        self.closed: list[HourRow] = []
+
+    def add(self, index: int, value: float, now: float) -> None:
+        """Add a reading taken at ``now``."""
+        if now >= self.bucket_start + STATISTICS_BUCKET:
+            self._close_bucket(now)
+        self.bucket.add(index, value)
+
+    def flush(self, now: float) -> list[HourRow]:
+        """Close the bucket and hour if they are over; return closed hours."""
+        if now >= self.bucket_start + STATISTICS_BUCKET:
+            self._close_bucket(now)
+        if now >= self.hour_start + HOUR:
+            self._close_hour()
+            self.hour_start = now - now % HOUR
+        closed, self.closed = self.closed, []
+        return closed
+
+    def _close_bucket(self, now: float) -> None:
+        """Fold the bucket into its hour and start the bucket holding ``now``."""
+        bucket_hour = self.bucket_start - self.bucket_start % HOUR
+        if bucket_hour != self.hour_start:
+            self._close_hour()
+            self.hour_start = bucket_hour
+        self.hour.merge(self.bucket)
+        self.bucket.clear()
+        self.bucket_start = now - now % STATISTICS_BUCKET
+
+    def _close_hour(self) -> None:
+        """Queue a row for every slot read during the hour."""
+        hour = self.hour
+        self.closed.extend(
+            (
+                self.hour_start,
+                index,
+                hour.total[index] / count,
+                hour.minimum[index],
+                hour.maximum[index],
+            )
+            for index, count in enumerate(hour.count)
+            if count
+        )
+        hour.clear()
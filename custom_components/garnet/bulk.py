@@ -0,0 +1,78 @@
+"""Bulk decoding of captured BTP7 frames.
+
+Meant for offline analysis of large captures rather than for the
+integration itself, and needs NumPy. NumPy is not a requirement of the
+integration, so it is only imported when a function here is called.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING
+
+from .frames import BTP7
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Matches the "<HxBBBBBBBBBBB" BTP7 layout, fields named after their sensors
+BTP7_FIELDS = [("coach_id", "<u2"), ("_pad", "u1")] + [
+    (str(channel.key) if channel is not None else f"field_{index}", "u1")
+    for index, channel in enumerate(BTP7.channels, start=1)
+]
+if sum(int(kind[-1]) for _, kind in BTP7_FIELDS) != BTP7.length:
+    raise ValueError(f"BTP7 fields do not add up to its {BTP7.length} byte frame")
+
+
+@cache
+def btp7_dtype() -> np.dtype:
+    """Return the structured dtype of a BTP7 frame."""
+    import numpy as np  # noqa: PLC0415
+
+    return np.dtype(BTP7_FIELDS)
+
+
+def btp7_records(frames: bytes | bytearray | memoryview | np.ndarray) -> np.ndarray:
+    """View BTP7 frames as a structured array without copying.
+
+    ``frames`` is a contiguous buffer of back to back 14 byte frames, a
+    uint8 array of shape (N, 14) or an array already using btp7_dtype().
+    """
+    import numpy as np  # noqa: PLC0415
+
+    dtype = btp7_dtype()
+    if isinstance(frames, np.ndarray):
+        if frames.dtype == dtype:
+            return frames.reshape(-1)
+        frames = np.ascontiguousarray(frames, dtype=np.uint8)
+        return frames.view(dtype).reshape(-1)
+    return np.frombuffer(frames, dtype=dtype)
+
+
+def decode_btp7(
+    frames: bytes | bytearray | memoryview | np.ndarray,
+) -> dict[str, np.ndarray]:
+    """Decode BTP7 frames into one column per sensor plus ``coach_id``.
+
+    Values match what the per-frame parser publishes: tank sentinels are
+    masked (they become None there) and voltage is scaled to volts.
+    """
+    import numpy as np  # noqa: PLC0415
+
+    records = btp7_records(frames)
+    columns: dict[str, np.ndarray] = {"coach_id": records["coach_id"]}
+    for channel in BTP7.channels:
+        if channel is None:
+            continue
+        key = str(channel.key)
+        raw = records[key]
+        if channel.scale != 1:
+            values = np.round(raw / channel.scale, 2)
+        else:
+            values = raw
+        if channel.sentinels:
+            values = np.ma.masked_array(
+                values, mask=np.isin(raw, tuple(channel.sentinels))
+            )
+        columns[key] = values
+    return columns
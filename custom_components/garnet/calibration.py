@@ -0,0 +1,86 @@
+"""Tank level to volume calibration.
+
+Calibrations are written one tank per line as level:volume points, e.g.
+
+    fresh_tank: 0:0, 25:40, 50:95, 100:200
+
+Each curve is compiled once into a table with the interpolated volume of
+every whole percent, so converting a reading is a single lookup.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from .readings import TANK_TYPES
+
+
+def parse_calibration(text: str) -> dict[str, list[tuple[float, float]]]:
+    """Parse calibration text into points per tank; raises ValueError."""
+    curves: dict[str, list[tuple[float, float]]] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        key, separator, points_text = line.partition(":")
+        key = key.strip()
+        if not separator or key not in TANK_TYPES:
+            raise ValueError(f"Unknown tank in calibration line: {line!r}")
+        points = []
+        for point in points_text.split(","):
+            level, _, volume = point.partition(":")
+            points.append((float(level), float(volume)))
+        points.sort()
+        if len(points) < 2 or points[0][0] > 0 or points[-1][0] < 100:
+            raise ValueError(f"Calibration of {key} must span 0 to 100 %")
+        if any(a[0] == b[0] for a, b in zip(points, points[1:])):
+            raise ValueError(f"Calibration of {key} repeats a level")
+        curves[key] = points
+    return curves
+
+
+def compile_table(points: list[tuple[float, float]]) -> tuple[float, ...]:
+    """Return the volume at every whole percent from 0 to 100."""
+    table = []
+    segment = 0
+    for level in range(101):
+        while points[segment + 1][0] < level:
+            segment += 1
+        (x0, y0), (x1, y1) = points[segment], points[segment + 1]
+        table.append(round(y0 + (y1 - y0) * (level - x0) / (x1 - x0), 1))
+    return tuple(table)
+
+
+class VolumeCalibration:
+    """Convert tank levels to volumes with precompiled tables."""
+
+    def __init__(
+        self, curves: Mapping[str, list[tuple[float, float]]], unit: str
+    ) -> None:
+        """Init members."""
+        self.unit = unit
+        self.tables = {key: compile_table(points) for key, points in curves.items()}
+
+    @classmethod
+    def from_text(cls, text: str, unit: str) -> VolumeCalibration | None:
+        """Build a calibration from options text; None if it has no curves."""
+        if not (curves := parse_calibration(text)):
+            return None
+        return cls(curves, unit)
+
+    def volume(self, key: str, level: float | None) -> float | None:
+        """Return the volume of a calibrated tank at a level.
+
+        Whole percent levels are a table lookup; others are interpolated
+        between the two neighbouring entries.
+        """
+        if level is None:
+            return None
+        table = self.tables[key]
+        if level <= 0:
+            return table[0]
+        if level >= 100:
+            return table[100]
+        low = int(level)
+        if low == level:
+            return table[low]
+        return round(table[low] + (table[low + 1] - table[low]) * (level - low), 1)
@@ -0,0 +1,73 @@
+"""Capture format for raw Garnet advertisements.
+
+A capture is a JSON Lines file with one advertisement per line:
+
+    {"t": 1718000000.1, "address": "AA:BB:CC:DD:EE:FF", "mfr": 3264, "data": "34"}
+
+``t`` is a timestamp in seconds, ``mfr`` the manufacturer id and ``data``
+the hex encoded manufacturer payload.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+import json
+from typing import IO, NamedTuple
+
+from home_assistant_bluetooth import BluetoothServiceInfo
+
+
+class CaptureRecord(NamedTuple):
+    """One captured advertisement."""
+
+    timestamp: float
+    address: str
+    manufacturer_id: int
+    payload: bytes
+
+    def to_service_info(
+        self, rssi: int = -60, source: str = "capture"
+    ) -> BluetoothServiceInfo:
+        """Build the service info Home Assistant would hand to the parser."""
+        return BluetoothServiceInfo(
+            name=self.address,
+            address=self.address,
+            rssi=rssi,
+            manufacturer_data={self.manufacturer_id: self.payload},
+            service_data={},
+            service_uuids=[],
+            source=source,
+        )
+
+
+def write_capture(fp: IO[str], records: Iterable[CaptureRecord]) -> int:
+    """Write records as JSON Lines and return how many were written."""
+    count = 0
+    for record in records:
+        fp.write(
+            json.dumps(
+                {
+                    "t": record.timestamp,
+                    "address": record.address,
+                    "mfr": record.manufacturer_id,
+                    "data": record.payload.hex(),
+                }
+            )
+        )
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def read_capture(fp: IO[str]) -> Iterator[CaptureRecord]:
+    """Read records from a JSON Lines capture, skipping blank lines."""
+    for line in fp:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        yield CaptureRecord(
+            float(item["t"]),
+            item["address"],
+            int(item["mfr"]),
+            bytes.fromhex(item["data"]),
+        )
@@ -0,0 +1,80 @@
+"""Assembly of round-robin channels into coalesced updates."""
+
+from __future__ import annotations
+
+from .frames import Channel, Reading
+
+# A channel missing from this many completed rotations is reported as stale
+STALE_ROTATIONS = 2
+
+
+class ChannelTable:
+    """Latest reading of every channel of a multiplexed frame.
+
+    Readings are collected until the rotation wraps around (its first
+    channel shows up again after others) or ``window`` seconds pass, then
+    published together. A channel repeated within a rotation only updates
+    its pending value, so a panel dwelling on one channel closes a rotation
+    at most once per as many frames as it has channels. Channels that stop
+    showing up for STALE_ROTATIONS rotations are published once as
+    unavailable.
+    """
+
+    def __init__(self, window: float = 0) -> None:
+        """Init members."""
+        self.window = window
+        self.rotation = 0
+        self.values: dict[Channel, int | float | None] = {}
+        self.last_seen: dict[Channel, float] = {}
+        self._last_rotation: dict[Channel, int] = {}
+        self._stale: set[Channel] = set()
+        self._pending: dict[Channel, int | float | None] = {}
+        self._first: Channel | None = None
+        self._frames = 0
+        self._window_start = 0.0
+
+    def add(
+        self, channel: Channel, value: int | float | None, now: float
+    ) -> list[Reading]:
+        """Store a reading and return what is ready to publish, if anything."""
+        published: list[Reading] = []
+        pending = self._pending
+        if (channel == self._first and self._wraps()) or (
+            self.window and pending and now - self._window_start >= self.window
+        ):
+            published = self._complete_rotation()
+        if not pending:
+            self._window_start = now
+            self._first = channel
+        self._frames += 1
+        pending[channel] = value
+        self.values[channel] = value
+        self.last_seen[channel] = now
+        self._last_rotation[channel] = self.rotation
+        self._stale.discard(channel)
+        return published
+
+    def _wraps(self) -> bool:
+        """Return True if the first channel coming back closes the rotation.
+
+        It does once another channel was seen since, or once the rotation
+        has as many frames as there are channels, so a panel whose other
+        senders went quiet still publishes.
+        """
+        return len(self._pending) > 1 or self._frames >= len(self._last_rotation)
+
+    def _complete_rotation(self) -> list[Reading]:
+        """Close the current rotation and return its readings and stale channels."""
+        published = list(self._pending.items())
+        self._pending.clear()
+        self._frames = 0
+        self.rotation += 1
+        for channel, last_rotation in self._last_rotation.items():
+            if (
+                self.rotation - last_rotation > STALE_ROTATIONS
+                and channel not in self._stale
+            ):
+                self._stale.add(channel)
+                self.values[channel] = None
+                published.append((channel, None))
+        return published
@@ -0,0 +1,52 @@
+"""Routing of frames by coach id."""
+
+from __future__ import annotations
+
+from math import inf
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .parser import GarnetBluetoothDeviceData
+
+CoachKey = tuple[int, int]
+
+
+class CoachRouter:
+    """Pick a single device to publish each coach heard through several addresses.
+
+    A panel and its repeaters advertise the same coach id from different
+    addresses. Devices are ranked by when their config entry was created, so
+    the same device owns a coach after every restart or reload. The others
+    hand their frames to it instead of publishing their own copy of every
+    sensor, and their entities are marked unavailable; that includes an
+    owner displaced by an older device that starts hearing the coach.
+    """
+
+    def __init__(self) -> None:
+        """Init members."""
+        self._ranks: dict[GarnetBluetoothDeviceData, float] = {}
+        self._owners: dict[CoachKey, GarnetBluetoothDeviceData] = {}
+
+    def register(self, device: GarnetBluetoothDeviceData, rank: float) -> None:
+        """Add a device that may own coaches; the lowest rank wins."""
+        self._ranks[device] = rank
+
+    def unregister(self, device: GarnetBluetoothDeviceData) -> None:
+        """Remove a device and release the coaches it owned."""
+        self._ranks.pop(device, None)
+        for key in [key for key, owner in self._owners.items() if owner is device]:
+            del self._owners[key]
+
+    def owner(
+        self, key: CoachKey, device: GarnetBluetoothDeviceData
+    ) -> GarnetBluetoothDeviceData:
+        """Return the device owning a coach that ``device`` just heard."""
+        owner = self._owners.get(key)
+        if owner is device:
+            return device
+        if owner is None or self._ranks.get(device, inf) < self._ranks[owner]:
+            self._owners[key] = device
+            if owner is not None:
+                owner.hand_over()
+            return device
+        return owner
@@ -10,12 +10,50 @@ from homeassistant.components.bluetooth import (
     BluetoothServiceInfoBleak,
     async_discovered_service_info,
 )
-from homeassistant.config_entries import ConfigFlow
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.const import CONF_ADDRESS
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-
-from .const import DOMAIN
-from .parser import GarnetBluetoothDeviceData as DeviceData
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
+
+from .calibration import parse_calibration
+from .const import (
+    CONF_CALIBRATION,
+    CONF_COALESCE_ROTATION,
+    CONF_COALESCE_WINDOW,
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
+    CONF_DERIVED_RATES,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_HEARTBEAT,
+    CONF_MERGE_COACHES,
+    CONF_MIN_INTERVAL,
+    CONF_RATE_WINDOW,
+    CONF_RECORD_RAW,
+    CONF_STALE_LPG,
+    CONF_STALE_TANK,
+    CONF_STALE_TEMPERATURE,
+    CONF_STALE_VOLTAGE,
+    CONF_VOLUME_UNIT,
+    DATA_CLASSIFIER,
+    DEFAULT_CALIBRATION,
+    DEFAULT_COALESCE_ROTATION,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBAND_PERCENT,
+    DEFAULT_DERIVED_RATES,
+    DEFAULT_EXTERNAL_STATISTICS,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_MERGE_COACHES,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_RATE_WINDOW,
+    DEFAULT_RECORD_RAW,
+    DEFAULT_STALE,
+    DEFAULT_VOLUME_UNIT,
+    DOMAIN,
+    VOLUME_UNITS,
+)
+from .discovery import DeviceClassifier, device_title
 
 
 class GarnetConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -26,31 +64,33 @@ class GarnetConfigFlow(ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._discovery_info: BluetoothServiceInfoBleak | None = None
-        self._discovered_device: DeviceData | None = None
+        self._discovered_title: str | None = None
         self._discovered_devices: dict[str, str] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return GarnetOptionsFlow(config_entry)
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> FlowResult:
         """Handle the bluetooth discovery step."""
         await self.async_set_unique_id(discovery_info.address)
         self._abort_if_unique_id_configured()
-        device = DeviceData()
-        if not device.supported(discovery_info):
+        if (spec := self._classifier().classify(discovery_info)) is None:
             return self.async_abort(reason="not_supported")
         self._discovery_info = discovery_info
-        self._discovered_device = device
+        self._discovered_title = device_title(spec, discovery_info.address)
         return await self.async_step_bluetooth_confirm()
 
     async def async_step_bluetooth_confirm(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Confirm discovery."""
-        assert self._discovered_device is not None
-        device = self._discovered_device
-        assert self._discovery_info is not None
-        discovery_info = self._discovery_info
-        title = device.title or device.get_device_name() or discovery_info.name
+        assert self._discovered_title is not None
+        title = self._discovered_title
         if user_input is not None:
             return self.async_create_entry(title=title, data={})
 
@@ -74,15 +114,13 @@ class GarnetConfigFlow(ConfigFlow, domain=DOMAIN):
             )
 
         current_addresses = self._async_current_ids()
+        classifier = self._classifier()
         for discovery_info in async_discovered_service_info(self.hass, False):
             address = discovery_info.address
             if address in current_addresses or address in self._discovered_devices:
                 continue
-            device = DeviceData()
-            if device.supported(discovery_info):
-                self._discovered_devices[address] = (
-                    device.title or device.get_device_name() or discovery_info.name
-                )
+            if (spec := classifier.classify(discovery_info)) is not None:
+                self._discovered_devices[address] = device_title(spec, address)
 
         if not self._discovered_devices:
             return self.async_abort(reason="no_devices_found")
@@ -93,3 +131,121 @@ class GarnetConfigFlow(ConfigFlow, domain=DOMAIN):
                 {vol.Required(CONF_ADDRESS): vol.In(self._discovered_devices)}
             ),
         )
+
+    @callback
+    def _classifier(self) -> DeviceClassifier:
+        """Return the classifier shared by all flows."""
+        return self.hass.data.setdefault(DATA_CLASSIFIER, DeviceClassifier())
+
+
+class GarnetOptionsFlow(OptionsFlow):
+    """Handle Garnet options."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                parse_calibration(
+                    user_input.get(CONF_CALIBRATION, DEFAULT_CALIBRATION)
+                )
+            except ValueError:
+                errors[CONF_CALIBRATION] = "invalid_calibration"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = {**self._entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_MIN_INTERVAL,
+                        default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_DEADBAND,
+                        default=options.get(CONF_DEADBAND, DEFAULT_DEADBAND),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_DEADBAND_PERCENT,
+                        default=options.get(
+                            CONF_DEADBAND_PERCENT, DEFAULT_DEADBAND_PERCENT
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                    vol.Optional(
+                        CONF_HEARTBEAT,
+                        default=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_RECORD_RAW,
+                        default=options.get(CONF_RECORD_RAW, DEFAULT_RECORD_RAW),
+                    ): bool,
+                    vol.Optional(
+                        CONF_MERGE_COACHES,
+                        default=options.get(
+                            CONF_MERGE_COACHES, DEFAULT_MERGE_COACHES
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_COALESCE_ROTATION,
+                        default=options.get(
+                            CONF_COALESCE_ROTATION, DEFAULT_COALESCE_ROTATION
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_COALESCE_WINDOW,
+                        default=options.get(
+                            CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_STALE_TANK,
+                        default=options.get(CONF_STALE_TANK, DEFAULT_STALE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_STALE_LPG,
+                        default=options.get(CONF_STALE_LPG, DEFAULT_STALE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_STALE_TEMPERATURE,
+                        default=options.get(CONF_STALE_TEMPERATURE, DEFAULT_STALE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_STALE_VOLTAGE,
+                        default=options.get(CONF_STALE_VOLTAGE, DEFAULT_STALE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_DERIVED_RATES,
+                        default=options.get(
+                            CONF_DERIVED_RATES, DEFAULT_DERIVED_RATES
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_RATE_WINDOW,
+                        default=options.get(CONF_RATE_WINDOW, DEFAULT_RATE_WINDOW),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=60)),
+                    vol.Optional(
+                        CONF_VOLUME_UNIT,
+                        default=options.get(CONF_VOLUME_UNIT, DEFAULT_VOLUME_UNIT),
+                    ): vol.In(VOLUME_UNITS),
+                    vol.Optional(
+                        CONF_EXTERNAL_STATISTICS,
+                        default=options.get(
+                            CONF_EXTERNAL_STATISTICS, DEFAULT_EXTERNAL_STATISTICS
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_CALIBRATION,
+                        default=options.get(CONF_CALIBRATION, DEFAULT_CALIBRATION),
+                    ): TextSelector(TextSelectorConfig(multiline=True)),
+                }
+            ),
+            errors=errors,
+        )
@@ -2,15 +2,88 @@
 
 from enum import StrEnum
 
-from homeassistant.const import Platform
+from homeassistant.const import Platform, UnitOfVolume
 
 DOMAIN = "garnet"
+DATA_COACH_ROUTER = f"{DOMAIN}_coach_router"
+DATA_STALE_TRACKER = f"{DOMAIN}_stale_tracker"
+DATA_CLASSIFIER = f"{DOMAIN}_classifier"
 
 PLATFORMS = [Platform.SENSOR]
 
 MFR_ID_BTP3 = 305
 MFR_ID_BTP7 = 3264
 
+CONF_MIN_INTERVAL = "min_interval"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_PERCENT = "deadband_percent"
+CONF_HEARTBEAT = "heartbeat"
+CONF_RECORD_RAW = "record_raw"
+CONF_MERGE_COACHES = "merge_coaches"
+CONF_COALESCE_ROTATION = "coalesce_rotation"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_STALE_TANK = "stale_tank"
+CONF_STALE_LPG = "stale_lpg"
+CONF_STALE_TEMPERATURE = "stale_temperature"
+CONF_STALE_VOLTAGE = "stale_voltage"
+CONF_DERIVED_RATES = "derived_rates"
+CONF_RATE_WINDOW = "rate_window"
+CONF_CALIBRATION = "calibration"
+CONF_VOLUME_UNIT = "volume_unit"
+CONF_EXTERNAL_STATISTICS = "external_statistics"
+
+DEFAULT_MIN_INTERVAL = 0
+DEFAULT_DEADBAND = 0.0
+DEFAULT_DEADBAND_PERCENT = 0.0
+DEFAULT_HEARTBEAT = 0
+DEFAULT_RECORD_RAW = False
+DEFAULT_MERGE_COACHES = False
+DEFAULT_COALESCE_ROTATION = False
+DEFAULT_COALESCE_WINDOW = 0
+DEFAULT_STALE = 0
+DEFAULT_DERIVED_RATES = False
+DEFAULT_RATE_WINDOW = 3600
+DEFAULT_CALIBRATION = ""
+DEFAULT_VOLUME_UNIT = UnitOfVolume.LITERS
+DEFAULT_EXTERNAL_STATISTICS = False
+
+VOLUME_UNITS = [UnitOfVolume.LITERS, UnitOfVolume.GALLONS]
+
+# Ring size of the raw advertisement recorder, 48 bytes per slot
+RECORDER_SLOTS = 65536
+
+SERVICE_EXPORT_RAW_FRAMES = "export_raw_frames"
+SERVICE_GET_SNAPSHOT = "get_snapshot"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_FILENAME = "filename"
+
+# OPN/NBO and similar per-sensor notices are logged at most this often (seconds)
+DIAGNOSTIC_LOG_INTERVAL = 300.0
+
+# Identical advertisements are re-parsed at most this often (seconds)
+DEDUP_MAX_AGE = 30.0
+
+# Parser metric sensors are refreshed at most this often (seconds)
+METRICS_INTERVAL = 60.0
+
+# When several receivers hear a device, frames from all but one are dropped.
+# The preferred receiver changes when it is silent for SOURCE_STALE seconds
+# or another one's rolling RSSI is SOURCE_HYSTERESIS dB better
+SOURCE_STALE = 10.0
+SOURCE_HYSTERESIS = 6.0
+SOURCE_RSSI_WEIGHT = 0.2
+
+# Recent frames kept per device for the diagnostics download
+HISTORY_SIZE = 100
+
+# Addresses whose classification is remembered by the config flow; random
+# BLE addresses rotate, so the least recently seen are forgotten
+CLASSIFIER_CACHE_SIZE = 256
+
+# With external statistics on, readings are aggregated in buckets of this
+# many seconds and states are written at most this often
+STATISTICS_BUCKET = 300
+
 
 class GarnetTypes(StrEnum):
     """Garnet value types."""
@@ -0,0 +1,28 @@
+"""Diagnostics support for Garnet."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from bluetooth_data_tools import monotonic_time_coarse
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .models import GarnetData
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    garnet_data: GarnetData = hass.data[DOMAIN][entry.entry_id]
+    device = garnet_data.device
+    return {
+        "options": dict(entry.options),
+        "model": device.model,
+        "metrics": device.metrics.as_dict(),
+        "sources": device.sources.as_dict(monotonic_time_coarse()),
+        "history": device.history.as_list(),
+    }
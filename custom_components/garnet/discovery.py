@@ -0,0 +1,62 @@
+"""Recognising Garnet devices from their advertisements."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from bluetooth_data_tools import short_address
+from home_assistant_bluetooth import BluetoothServiceInfo
+
+from .const import CLASSIFIER_CACHE_SIZE
+from .frames import REGISTRY, FrameSpec
+
+MANUFACTURER = "Garnet"
+
+# Manufacturer id and payload length of every manufacturer data entry
+AdvertisementShape = tuple[tuple[int, int], ...]
+
+
+def classify(manufacturer_data: Mapping[int, bytes]) -> FrameSpec | None:
+    """Return the frame spec matching the manufacturer id and payload length."""
+    for manufacturer_id, payload in manufacturer_data.items():
+        if (spec := REGISTRY.get(manufacturer_id, payload)) is not None:
+            return spec
+    return None
+
+
+def device_title(spec: FrameSpec, address: str) -> str:
+    """Return the name a device of this model gets."""
+    return f"{MANUFACTURER} {spec.model} {short_address(address)}"
+
+
+class DeviceClassifier:
+    """Classify advertisements, remembering the answer per address.
+
+    An address is only looked at again when the manufacturer ids it
+    advertises or their payload lengths change, the key the frame registry
+    looks specs up by. At most ``size`` addresses are remembered; the least
+    recently classified is dropped first.
+    """
+
+    def __init__(self, size: int = CLASSIFIER_CACHE_SIZE) -> None:
+        """Init members."""
+        self.size = size
+        self._cache: dict[str, tuple[AdvertisementShape, FrameSpec | None]] = {}
+
+    def classify(self, service_info: BluetoothServiceInfo) -> FrameSpec | None:
+        """Return the frame spec of a Garnet advertisement, None for others."""
+        shape = tuple(
+            (manufacturer_id, len(payload))
+            for manufacturer_id, payload in service_info.manufacturer_data.items()
+        )
+        cache = self._cache
+        # Re-inserted on every lookup, so dict order is least recent first
+        cached = cache.pop(service_info.address, None)
+        if cached is not None and cached[0] == shape:
+            spec = cached[1]
+        else:
+            spec = classify(service_info.manufacturer_data)
+        cache[service_info.address] = (shape, spec)
+        if len(cache) > self.size:
+            del cache[next(iter(cache))]
+        return spec
@@ -0,0 +1,324 @@
+"""Garnet frame specifications.
+
+Each SeeLevel model is described as data: a precompiled struct layout and a
+table of channels saying which sensor every unpacked field feeds. Adding a
+model means adding a spec to FRAME_SPECS, not another parse method; the
+parser finds a payload's spec with a single lookup on manufacturer id and
+payload length. ``python -m benchmarks.conformance`` checks every spec.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import product
+import logging
+from struct import Struct
+from typing import NamedTuple
+
+from .const import MFR_ID_BTP3, MFR_ID_BTP7, GarnetTypes
+from .logger import RateLimitedLogger
+
+_LOGGER = logging.getLogger(__name__)
+_NOTICES = RateLimitedLogger(_LOGGER)
+
+# Tank levels reported when a sender is open or not installed
+TANK_SENTINELS = frozenset({102, 110})
+
+
+# Every ASCII character int() accepts in a number: digits, signs, the
+# underscore between digits and whitespace around them
+NUMBER_CHARACTERS = b"0123456789+-_ \t\n\r\x0b\x0c"
+
+
+def ascii_numbers(width: int) -> dict[bytes, int]:
+    """Return every number written in ``width`` ASCII characters.
+
+    Fields are digits, padded with spaces and optionally signed, such as
+    b" 67", b"-05" or b"+05". Looking a field up here replaces int(), which
+    raises on every malformed field, and accepts the same fields it does.
+    """
+    numbers = {}
+    for characters in product(NUMBER_CHARACTERS, repeat=width):
+        text = bytes(characters)
+        try:
+            numbers[text] = int(text)
+        except ValueError:
+            continue
+    return numbers
+
+
+class Channel(NamedTuple):
+    """Mapping of one decoded value onto a sensor."""
+
+    key: str
+    unit: str = "%"
+    device_class: str | None = None
+    scale: int = 1
+    sentinels: frozenset[int] = frozenset()
+
+    def convert(self, raw: int) -> int | float | None:
+        """Convert a raw integer reading to the native value."""
+        if raw in self.sentinels:
+            return None
+        if self.scale != 1:
+            return round(raw / self.scale, 2)
+        return raw
+
+
+Reading = tuple[Channel, "int | float | None"]
+
+
+class FrameSpec(ABC):
+    """Base for a model's advertisement layout."""
+
+    def __init__(
+        self, model: str, manufacturer_id: int, layout: str, length: int | None = None
+    ) -> None:
+        """Init members."""
+        self.model = model
+        self.manufacturer_id = manufacturer_id
+        self.layout = Struct(layout)
+        self.length = self.layout.size if length is None else length
+
+    @abstractmethod
+    def coach_id(self, payload: bytes) -> int:
+        """Return the coach id of a payload without decoding the rest."""
+
+    @abstractmethod
+    def heard_channels(self, payload: bytes) -> Sequence[Channel]:
+        """Return the channels a payload reports, without decoding values."""
+
+    @abstractmethod
+    def decode(
+        self, payload: bytes, notices: RateLimitedLogger = _NOTICES
+    ) -> tuple[int, Sequence[Reading]]:
+        """Decode a payload into the coach id and its readings.
+
+        Sensor notices such as an open sender are logged through
+        ``notices``; parsers pass their own so the rate limit is per device.
+        """
+
+
+class FixedFrameSpec(FrameSpec):
+    """Frame carrying every channel at a fixed position.
+
+    The first unpacked field is the coach id, the rest line up with
+    ``channels``; ``None`` marks fields whose meaning is unknown. Channel
+    fields are single unsigned bytes, so every reading they can produce is
+    built once up front and decoding is a table lookup per channel.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        manufacturer_id: int,
+        layout: str,
+        channels: tuple[Channel | None, ...],
+    ) -> None:
+        """Init members."""
+        super().__init__(model, manufacturer_id, layout)
+        self.channels = channels
+        self._heard = tuple(channel for channel in channels if channel is not None)
+        self._tables = tuple(
+            (index, tuple((channel, channel.convert(raw)) for raw in range(256)))
+            for index, channel in enumerate(channels, start=1)
+            if channel is not None
+        )
+
+    def coach_id(self, payload: bytes) -> int:
+        """Return the coach id of a payload without decoding the rest."""
+        return int.from_bytes(payload[:2], "little")
+
+    def heard_channels(self, payload: bytes) -> Sequence[Channel]:
+        """Return the channels a payload reports, without decoding values."""
+        return self._heard
+
+    def decode(
+        self, payload: bytes, notices: RateLimitedLogger = _NOTICES
+    ) -> tuple[int, Sequence[Reading]]:
+        """Decode a payload into the coach id and its readings."""
+        fields = self.layout.unpack(payload)
+        return fields[0], [table[fields[index]] for index, table in self._tables]
+
+
+class MultiplexedFrameSpec(FrameSpec):
+    """Frame carrying a single channel chosen by a sensor type byte.
+
+    The layout holds the coach id (low word and high byte), the sensor type
+    and three character ASCII fields for the value, the volume and the tank
+    total. Anything after them up to ``length`` is not decoded. Tank
+    channels (unit "%") also publish the volume and total fields, as
+    ``<key>_volume`` and ``<key>_total``, when they are numeric. Fields are
+    parsed with a lookup table, so malformed ones cost no exception.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        manufacturer_id: int,
+        layout: str,
+        length: int,
+        channels: tuple[Channel, ...],
+        boot_type: int,
+        unavailable: frozenset[bytes],
+    ) -> None:
+        """Init members."""
+        super().__init__(model, manufacturer_id, layout, length)
+        self.channels = channels
+        self.boot_type = boot_type
+        self.unavailable = {value: value.decode("ascii") for value in unavailable}
+        self.numbers = ascii_numbers(3)
+        self._unknown: dict[int, Channel] = {}
+        self._volumes = {
+            channel: (
+                Channel(f"{channel.key}_volume", None),
+                Channel(f"{channel.key}_total", None),
+            )
+            for channel in channels
+            if channel.unit == "%"
+        }
+
+    def channel(self, sensor_type: int) -> Channel:
+        """Return the channel for a sensor type."""
+        if sensor_type < len(self.channels):
+            return self.channels[sensor_type]
+        if (channel := self._unknown.get(sensor_type)) is None:
+            channel = self._unknown[sensor_type] = Channel(f"unknown_{sensor_type}")
+        return channel
+
+    def coach_id(self, payload: bytes) -> int:
+        """Return the coach id of a payload without decoding the rest."""
+        return int.from_bytes(payload[:3], "little")
+
+    def heard_channels(self, payload: bytes) -> Sequence[Channel]:
+        """Return the channels a payload reports, without decoding values."""
+        sensor_type = payload[3]
+        if sensor_type == self.boot_type:
+            return ()
+        return (self.channel(sensor_type),)
+
+    def decode(
+        self, payload: bytes, notices: RateLimitedLogger = _NOTICES
+    ) -> tuple[int, Sequence[Reading]]:
+        """Decode a payload into the coach id and its readings."""
+        coach_low, coach_high, sensor_type, value, volume, total = (
+            self.layout.unpack_from(payload)
+        )
+        coach_id = coach_low | coach_high << 16
+        if sensor_type == self.boot_type:
+            return coach_id, ()
+        channel = self.channel(sensor_type)
+        if (reason := self.unavailable.get(value)) is not None:
+            notices.info(
+                (sensor_type, value), "Sensor %s is %s, no update", channel.key, reason
+            )
+            return coach_id, ((channel, None),)
+        numbers = self.numbers
+        if (raw := numbers.get(value)) is None:
+            return coach_id, ((channel, None),)
+        if channel.scale != 1:
+            return coach_id, ((channel, round(raw / channel.scale, 2)),)
+        if (volume_channels := self._volumes.get(channel)) is not None:
+            volume_raw = numbers.get(volume)
+            total_raw = numbers.get(total)
+            if volume_raw is not None and total_raw is not None:
+                return coach_id, (
+                    (channel, raw),
+                    (volume_channels[0], volume_raw),
+                    (volume_channels[1], total_raw),
+                )
+        return coach_id, ((channel, raw),)
+
+
+_TEMP = ("DEGREE", "TEMPERATURE")
+_VOLTAGE = ("V", "VOLTAGE", 10)
+
+# Indexed by the BTP3 sensor type byte
+BTP3_CHANNELS = (
+    Channel(GarnetTypes.FRESH_TANK),
+    Channel(GarnetTypes.BLACK_TANK),
+    Channel(GarnetTypes.GREY_TANK),
+    Channel(GarnetTypes.LPG_TANK),
+    Channel(GarnetTypes.LPG_2_TANK),
+    Channel(GarnetTypes.GALLEY_TANK),
+    Channel(GarnetTypes.GALLEY_2_TANK),
+    Channel(GarnetTypes.TEMP, *_TEMP),
+    Channel(GarnetTypes.TEMP_2, *_TEMP),
+    Channel(GarnetTypes.TEMP_3, *_TEMP),
+    Channel(GarnetTypes.TEMP_4, *_TEMP),
+    Channel(GarnetTypes.CHEMICAL_TANK),
+    Channel(GarnetTypes.CHEMICAL_2_TANK),
+    Channel(GarnetTypes.BATTERY, *_VOLTAGE),
+)
+
+# Ordered as the fields following the BTP7 coach id
+BTP7_CHANNELS = (
+    Channel(GarnetTypes.FRESH_TANK, sentinels=TANK_SENTINELS),
+    Channel(GarnetTypes.GREY_TANK, sentinels=TANK_SENTINELS),
+    Channel(GarnetTypes.BLACK_TANK, sentinels=TANK_SENTINELS),
+    Channel(GarnetTypes.FRESH_TANK2, sentinels=TANK_SENTINELS),
+    Channel(GarnetTypes.GREY_TANK2, sentinels=TANK_SENTINELS),
+    Channel(GarnetTypes.BLACK_TANK2, sentinels=TANK_SENTINELS),
+    None,  # unk_4
+    Channel(GarnetTypes.LPG_TANK, sentinels=TANK_SENTINELS),
+    Channel(GarnetTypes.BATTERY, *_VOLTAGE),
+    None,  # unk_6
+    None,  # unk_7
+)
+
+BTP3 = MultiplexedFrameSpec(
+    "709-BTP3",
+    MFR_ID_BTP3,
+    "<HBB3s3s3s",
+    14,
+    BTP3_CHANNELS,
+    boot_type=255,
+    unavailable=frozenset({b"OPN", b"NBO"}),
+)
+BTP7 = FixedFrameSpec("709-BTP7", MFR_ID_BTP7, "<HxBBBBBBBBBBB", BTP7_CHANNELS)
+
+
+class FrameRegistry:
+    """Frame specs keyed by manufacturer id and payload length.
+
+    Finding the spec of a payload is one dict lookup however many models
+    are registered. A manufacturer id may carry several models as long as
+    their payloads differ in length.
+    """
+
+    def __init__(self, specs: Iterable[FrameSpec] = ()) -> None:
+        """Init members."""
+        self._specs: dict[tuple[int, int], FrameSpec] = {}
+        self.manufacturer_ids: set[int] = set()
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: FrameSpec) -> None:
+        """Add a spec; raises ValueError if it clashes with a registered one."""
+        if spec.layout.size > spec.length:
+            raise ValueError(f"Layout of {spec.model} is longer than its frames")
+        key = (spec.manufacturer_id, spec.length)
+        if (registered := self._specs.get(key)) is not None:
+            raise ValueError(
+                f"{spec.model} has the manufacturer id and length of "
+                f"{registered.model}"
+            )
+        self._specs[key] = spec
+        self.manufacturer_ids.add(spec.manufacturer_id)
+
+    def get(self, manufacturer_id: int, payload: bytes) -> FrameSpec | None:
+        """Return the spec decoding a payload, None if there is none."""
+        return self._specs.get((manufacturer_id, len(payload)))
+
+    def __iter__(self) -> Iterator[FrameSpec]:
+        """Iterate over the registered specs."""
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        """Return the number of registered specs."""
+        return len(self._specs)
+
+
+FRAME_SPECS: tuple[FrameSpec, ...] = (BTP3, BTP7)
+REGISTRY = FrameRegistry(FRAME_SPECS)
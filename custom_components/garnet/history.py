@@ -0,0 +1,58 @@
+"""Bounded in-memory history of recent frames for diagnostics."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Sequence
+from typing import Any
+
+from .frames import Reading
+
+
+class FrameRecord:
+    """One received frame and what it decoded to."""
+
+    __slots__ = ("timestamp", "address", "manufacturer_id", "payload", "readings")
+
+    def __init__(
+        self,
+        timestamp: float,
+        address: str,
+        manufacturer_id: int,
+        payload: bytes,
+        readings: Sequence[Reading],
+    ) -> None:
+        """Init members."""
+        self.timestamp = timestamp
+        self.address = address
+        self.manufacturer_id = manufacturer_id
+        self.payload = payload
+        self.readings = readings
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record for diagnostics."""
+        return {
+            "t": self.timestamp,
+            "address": self.address,
+            "mfr": self.manufacturer_id,
+            "data": self.payload.hex(),
+            "readings": {str(channel.key): value for channel, value in self.readings},
+        }
+
+
+class FrameHistory:
+    """Keep the most recent frames, dropping the oldest when full."""
+
+    __slots__ = ("_records",)
+
+    def __init__(self, size: int) -> None:
+        """Init members."""
+        self._records: deque[FrameRecord] = deque(maxlen=size)
+
+    def append(self, record: FrameRecord) -> None:
+        """Add a frame."""
+        self._records.append(record)
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the frames for diagnostics, oldest first."""
+        return [record.as_dict() for record in self._records]
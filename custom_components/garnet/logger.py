@@ -0,0 +1,43 @@
+"""Rate limited logging for per-frame diagnostics."""
+
+from __future__ import annotations
+
+from collections.abc import Hashable
+import logging
+from typing import Any
+
+from bluetooth_data_tools import monotonic_time_coarse
+
+from .const import DIAGNOSTIC_LOG_INTERVAL
+
+
+class RateLimitedLogger:
+    """Log a message at most once per interval for each key.
+
+    Repeats inside the interval are only counted; the count is appended the
+    next time the message is logged. Nothing is done unless the logger is
+    enabled for INFO, and suppressed messages cost a dict lookup.
+    """
+
+    def __init__(
+        self, logger: logging.Logger, interval: float = DIAGNOSTIC_LOG_INTERVAL
+    ) -> None:
+        """Init members."""
+        self._logger = logger
+        self._interval = interval
+        self._next_log: dict[Hashable, float] = {}
+        self._suppressed: dict[Hashable, int] = {}
+
+    def info(self, key: Hashable, msg: str, *args: Any) -> None:
+        """Log at INFO level unless ``key`` was logged within the interval."""
+        if not self._logger.isEnabledFor(logging.INFO):
+            return
+        now = monotonic_time_coarse()
+        if now < self._next_log.get(key, 0.0):
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        self._next_log[key] = now + self._interval
+        if suppressed := self._suppressed.pop(key, 0):
+            self._logger.info(f"{msg} (repeated %d times)", *args, suppressed)
+        else:
+            self._logger.info(msg, *args)
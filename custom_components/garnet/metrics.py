@@ -0,0 +1,94 @@
+"""Parser instrumentation."""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+# Parse times are binned by powers of two of microseconds; the last bucket
+# collects everything from about 16 ms up
+PARSE_TIME_BUCKETS = 16
+
+
+class ParserMetrics:
+    """Counters and a parse time histogram for one device.
+
+    Everything is allocated up front, so recording a frame is a handful of
+    integer increments.
+    """
+
+    __slots__ = (
+        "frames_received",
+        "frames_duplicate",
+        "frames_other_source",
+        "frames_wrong_length",
+        "frames_boot",
+        "frames_unavailable",
+        "readings_unavailable",
+        "readings_unknown",
+        "updates_emitted",
+        "parse_times",
+    )
+
+    def __init__(self, manufacturer_ids: tuple[int, ...]) -> None:
+        """Init members."""
+        self.frames_received = dict.fromkeys(manufacturer_ids, 0)
+        self.frames_duplicate = 0
+        self.frames_other_source = 0
+        self.frames_wrong_length = 0
+        self.frames_boot = 0
+        self.frames_unavailable = 0
+        self.readings_unavailable = 0
+        self.readings_unknown = 0
+        self.updates_emitted = 0
+        self.parse_times = array("Q", bytes(8 * PARSE_TIME_BUCKETS))
+
+    @property
+    def frames_dropped(self) -> int:
+        """Return frames that gave no usable reading.
+
+        These are frames of an unknown length, boot frames and frames whose
+        readings are all unavailable, such as a BTP3 sensor reporting OPN or
+        NBO. Duplicates and copies from other receivers are counted apart.
+        """
+        return self.frames_wrong_length + self.frames_boot + self.frames_unavailable
+
+    def record_parse_time(self, nanoseconds: int) -> None:
+        """Add one parse time to the histogram."""
+        self.parse_times[
+            min((nanoseconds >> 10).bit_length(), PARSE_TIME_BUCKETS - 1)
+        ] += 1
+
+    def parse_time_percentile(self, percentile: float) -> float | None:
+        """Return an upper bound in microseconds for a parse time percentile."""
+        total = sum(self.parse_times)
+        if not total:
+            return None
+        target = total * percentile / 100
+        seen = 0
+        for bucket, count in enumerate(self.parse_times):
+            seen += count
+            if seen >= target:
+                break
+        # Bucket n holds times below 2**n units of 1.024 us
+        return round((1 << bucket) * 1.024, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "frames_received": dict(self.frames_received),
+            "frames_duplicate": self.frames_duplicate,
+            "frames_other_source": self.frames_other_source,
+            "frames_wrong_length": self.frames_wrong_length,
+            "frames_boot": self.frames_boot,
+            "frames_unavailable": self.frames_unavailable,
+            "readings_unavailable": self.readings_unavailable,
+            "readings_unknown": self.readings_unknown,
+            "updates_emitted": self.updates_emitted,
+            "parse_time_us": {
+                "p50": self.parse_time_percentile(50),
+                "p90": self.parse_time_percentile(90),
+                "p99": self.parse_time_percentile(99),
+                "histogram": list(self.parse_times),
+            },
+        }
@@ -0,0 +1,91 @@
+"""Data models for the Garnet integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from sensor_state_data import SensorUpdate  # type: ignore  # noqa: PGH003
+
+from homeassistant.components.bluetooth.passive_update_processor import (
+    PassiveBluetoothDataProcessor,
+    PassiveBluetoothDataUpdate,
+    PassiveBluetoothEntityKey,
+    PassiveBluetoothProcessorCoordinator,
+)
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .const import GarnetTypes
+from .parser import GarnetBluetoothDeviceData
+from .recorder import RawRecorder
+
+
+@dataclass
+class GarnetData:
+    """Data for a Garnet config entry."""
+
+    coordinator: PassiveBluetoothProcessorCoordinator
+    device: GarnetBluetoothDeviceData
+    recorder: RawRecorder | None = None
+    processors: list[PassiveBluetoothDataProcessor] = field(default_factory=list)
+    stale: set[PassiveBluetoothEntityKey] = field(default_factory=set)
+
+    @callback
+    def async_push(self, update: SensorUpdate) -> None:
+        """Hand an update that did not come from our coordinator to the processors."""
+        for processor in self.processors:
+            processor.async_handle_update(update)
+
+    @callback
+    def async_set_stale(self, keys: set[str], stale: bool) -> None:
+        """Mark channels stale or fresh and refresh their entities."""
+        entity_keys = {PassiveBluetoothEntityKey(key, None) for key in keys}
+        if stale:
+            self.stale |= entity_keys
+        else:
+            self.stale -= entity_keys
+        for processor in self.processors:
+            processor.async_update_listeners(
+                PassiveBluetoothDataUpdate(
+                    entity_data={
+                        key: processor.entity_data.get(key) for key in entity_keys
+                    }
+                ),
+                changed_entity_keys=entity_keys,
+            )
+
+    @callback
+    def async_set_handed_over(self, handed_over: bool) -> None:
+        """Mark every entity unavailable while another device publishes them."""
+        for processor in self.processors:
+            processor.handed_over = handed_over
+            processor.async_update_listeners(
+                PassiveBluetoothDataUpdate(entity_data=dict(processor.entity_data))
+            )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the device's latest readings for the snapshot service.
+
+        Values come straight from the parser's value store, so they match
+        what the entities show.
+        """
+        device = self.device
+        values = device.values
+        return {
+            "address": device.address,
+            "model": device.model,
+            "coach_id": device.coach_id,
+            "last_seen": (
+                None
+                if device.last_seen is None
+                else dt_util.utc_from_timestamp(device.last_seen).isoformat()
+            ),
+            "available": self.coordinator.available and not device.handed_over,
+            "readings": {
+                str(key): values.values[index]
+                for index, key in enumerate(GarnetTypes)
+                if values.described[index]
+            },
+            "stale": sorted(entity_key.key for entity_key in self.stale),
+        }
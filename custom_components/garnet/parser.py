@@ -2,254 +2,391 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Sequence
 import logging
-from struct import unpack
+import time
 
-from bluetooth_data_tools import short_address
+from bluetooth_data_tools import monotonic_time_coarse, short_address
 from bluetooth_sensor_state_data import BluetoothData  # type: ignore  # noqa: PGH003
 from home_assistant_bluetooth import BluetoothServiceInfo
-
-from .const import MFR_ID_BTP3, MFR_ID_BTP7, GarnetTypes
+from sensor_state_data import SensorUpdate  # type: ignore  # noqa: PGH003
+
+from .aggregates import StatisticsAggregator
+from .calibration import VolumeCalibration
+from .channels import ChannelTable
+from .coach import CoachRouter
+from .const import DEDUP_MAX_AGE, HISTORY_SIZE, METRICS_INTERVAL, GarnetTypes
+from .frames import REGISTRY, FrameSpec, MultiplexedFrameSpec, Reading
+from .history import FrameHistory, FrameRecord
+from .logger import RateLimitedLogger
+from .metrics import ParserMetrics
+from .rates import RateTracker
+from .readings import SLOT_INDEX, ReadingStore
+from .recorder import RawRecorder
+from .sources import SourceArbiter
+from .throttle import PublishThrottle
 
 _LOGGER = logging.getLogger(__name__)
 
+SIGNAL_STRENGTH_INDEX = SLOT_INDEX["signal_strength"]
+# The Garnet sensor types are the first slots of the value store
+GARNET_TYPE_SLOTS = len(GarnetTypes)
+
+# Returned for advertisements that change nothing; never modified
+_UNCHANGED_UPDATE = SensorUpdate(
+    title=None, devices={}, entity_descriptions={}, entity_values={}
+)
+
 
 class GarnetBluetoothDeviceData(BluetoothData):
     """Date update for Garnet Bluetooth devices."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        throttle: PublishThrottle | None = None,
+        recorder: RawRecorder | None = None,
+        coaches: CoachRouter | None = None,
+        coalesce_window: float | None = None,
+        rates: RateTracker | None = None,
+        calibration: VolumeCalibration | None = None,
+        statistics: StatisticsAggregator | None = None,
+    ) -> None:
         """Init members."""
 
+        self.throttle = throttle
+        self.recorder = recorder
+        self.coaches = coaches
+        self.push: Callable[[SensorUpdate | ReadingStore], None] | None = None
+        self.seen: Callable[[str], None] | None = None
+        self.handed_over = False
+        self.on_hand_over: Callable[[bool], None] | None = None
+        self.coalesce_window = coalesce_window
+        self.rates = rates
+        self.calibration = calibration
+        self.statistics = statistics
+        self.channel_tables: dict[FrameSpec, ChannelTable] = {}
+        self._changed = False
         self.address: str = None
         self.manufacturer = "Garnet"
         self.model = "709-BT"
         self.device_id = None
+        self.coach_id: int | None = None
+        self.last_seen: float | None = None
+        self._notices = RateLimitedLogger(_LOGGER)
+        self._fingerprints: dict[tuple[str, int], tuple[bytes, float]] = {}
+        self.metrics = ParserMetrics(tuple(REGISTRY.manufacturer_ids))
+        self._metrics_published = -METRICS_INTERVAL
+        self.history = FrameHistory(HISTORY_SIZE)
+        self.sources = SourceArbiter()
+        self.values = ReadingStore()
+        self._announce = False
         super().__init__()
 
-    def _start_update(self, data: BluetoothServiceInfo) -> None:
-        """Update from BLE advertisement data."""
-        _LOGGER.debug("Parsing Garnet BLE advertisement data: %s", data)
-
-        self.address = data.address
-
-        hex_manufacturer_data = {
-            manufacturer_id: value.hex()
-            for manufacturer_id, value in data.manufacturer_data.items()
-        }
-
-        if MFR_ID_BTP3 in data.manufacturer_data:
-            _LOGGER.debug("Raw BTP3 Manufacturer Data %s", hex_manufacturer_data)
-            self.model = "709-BTP3"
-            manufacturer_data = data.manufacturer_data
-            data_bytes = manufacturer_data[MFR_ID_BTP3]
-            msg_length = len(data_bytes)
-            if msg_length == 14:
-                self._process_update_btp3(data_bytes)
-
-        if MFR_ID_BTP7 in data.manufacturer_data:
-            _LOGGER.debug("Raw BTP7 Manufacturer Data %s", hex_manufacturer_data)
-            self.model = "709-BTP7"
-            manufacturer_data = data.manufacturer_data
-            data_bytes = manufacturer_data[MFR_ID_BTP7]
-            msg_length = len(data_bytes)
-            if msg_length == 14:
-                self._process_update_btp7(data_bytes)
-
-        self.set_title(
-            f"{self.manufacturer} {self.model} {short_address(self.address)}"
-        )
-        self.set_device_name(
-            f"{self.manufacturer} {self.model} {short_address(self.address)}"
-        )
-        self.set_device_type(self.model)
-        self.set_device_manufacturer(self.manufacturer)
-
-    # 0 = Fresh
-    # 1 = Black
-    # 2 = Gray
-    # 3 = LPG
-    # 4 = LPG 2
-    # 5 = Galley
-    # 6 = Galley 2
-    # 7 = Temp
-    # 8 = Temp 2
-    # 9 = Temp 3
-    # 10 = Temp 4
-    # 11 = Chemical
-    # 12 = Chemical 2
-    # 13 = Battery x 10
-
-    def _get_sensor_name(self, sensor_type):
-        if sensor_type == 0:
-            return GarnetTypes.FRESH_TANK
-        if sensor_type == 1:
-            return GarnetTypes.BLACK_TANK
-        if sensor_type == 2:
-            return GarnetTypes.GREY_TANK
-        if sensor_type == 3:
-            return GarnetTypes.LPG_TANK
-        if sensor_type == 4:
-            return GarnetTypes.LPG_2_TANK
-        if sensor_type == 5:
-            return GarnetTypes.GALLEY_TANK
-        if sensor_type == 6:
-            return GarnetTypes.GALLEY_2_TANK
-        if sensor_type == 7:
-            return GarnetTypes.TEMP
-        if sensor_type == 8:
-            return GarnetTypes.TEMP_2
-        if sensor_type == 9:
-            return GarnetTypes.TEMP_3
-        if sensor_type == 10:
-            return GarnetTypes.TEMP_4
-        if sensor_type == 11:
-            return GarnetTypes.CHEMICAL_TANK
-        if sensor_type == 12:
-            return GarnetTypes.CHEMICAL_2_TANK
-        if sensor_type == 13:
-            return GarnetTypes.BATTERY
-
-        return f"unknown_{sensor_type}"
-
-    def _process_update_btp3(self, data: bytes) -> None:
-        """Update from BLE advertisement data."""
-        (coach_id, sensor_type, sensor_value, sensor_volume, sensor_total, alarm) = (
-            unpack("@3sc3s3s3sc", data)
-        )
-
-        coach_id = int.from_bytes(coach_id, byteorder="little")
-        sensor_type = int.from_bytes(sensor_type, byteorder="little")
-        sensor_value = sensor_value.decode("utf-8")
-        sensor_measurement_unit = "%"
-        sensor_available = True
-
-        _LOGGER.debug(
-            "Got coach_id %d sensor_type %d sensor_value %s",
-            coach_id,
-            sensor_type,
-            format(sensor_value),
-        )
-        if sensor_type == 255:
-            _LOGGER.debug("System booting up, skip update")
+    def update(self, data: BluetoothServiceInfo) -> SensorUpdate | ReadingStore:
+        """Update from BLE advertisement data, skipping repeated frames.
+
+        Copies heard by other than the preferred receiver are dropped first.
+        Returns a SensorUpdate while there are sensors or device info to
+        announce, and the value store itself when only values changed.
+        """
+        started = time.perf_counter_ns()
+        metrics = self.metrics
+        if not self.sources.accept(data.source, data.rssi, monotonic_time_coarse()):
+            metrics.frames_other_source += 1
+            return _UNCHANGED_UPDATE
+        if self._is_duplicate(data):
+            metrics.frames_duplicate += 1
+            owner = self if self.coaches is None else self._coach_owner(data)
+            owner.touch_channels(data)
+            return _UNCHANGED_UPDATE
+        if self.coaches is not None and (owner := self._coach_owner(data)) is not self:
+            self.hand_over()
+            owner.forward(data)
+            return _UNCHANGED_UPDATE
+        if self.handed_over:
+            self.hand_over(False)
+        self._start_update(data)
+        if not self._changed:
+            metrics.record_parse_time(time.perf_counter_ns() - started)
+            return _UNCHANGED_UPDATE
+        self._set_signal_strength(data.rssi)
+        self._publish_metrics()
+        update = self._build_update()
+        metrics.updates_emitted += 1
+        metrics.record_parse_time(time.perf_counter_ns() - started)
+        return update
+
+    def forward(self, data: BluetoothServiceInfo) -> None:
+        """Handle a frame of an owned coach heard through another address.
+
+        The frame is de-duplicated against our own so a repeater echoing the
+        panel is parsed once, and the signal strength is left alone.
+        """
+        if self._is_duplicate(data, self.address):
+            self.metrics.frames_duplicate += 1
+            self.touch_channels(data)
+            return
+        self._start_update(data)
+        if self._changed and self.push is not None:
+            self._publish_metrics()
+            self.metrics.updates_emitted += 1
+            self.push(self._build_update())
+
+    def hand_over(self, handed_over: bool = True) -> None:
+        """Note that another device publishes our coach, or no longer does."""
+        if handed_over != self.handed_over:
+            self.handed_over = handed_over
+            if self.on_hand_over is not None:
+                self.on_hand_over(handed_over)
+
+    def touch_channels(self, data: BluetoothServiceInfo) -> None:
+        """Mark the channels of a dropped repeat as heard from.
+
+        A panel repeating the same frame is still reporting, so its channels
+        must not go stale just because the repeats are de-duplicated. Only
+        the stale deadlines are pushed back; the payload is not decoded.
+        """
+        if (seen := self.seen) is None:
+            return
+        for manufacturer_id, payload in data.manufacturer_data.items():
+            if (spec := REGISTRY.get(manufacturer_id, payload)) is not None:
+                for channel in spec.heard_channels(payload):
+                    seen(channel.key)
+
+    def _build_update(self) -> SensorUpdate | ReadingStore:
+        """Return what to hand to the processors for this update."""
+        if not self._announce:
+            return self.values
+        self._announce = False
+        return self._finish_update()
+
+    def _set_value(
+        self,
+        key: str,
+        native_unit_of_measurement: str | None,
+        native_value: int | float | None,
+        device_class: str | None = None,
+    ) -> None:
+        """Set a sensor value.
+
+        The first value of a sensor goes through update_sensor so Home
+        Assistant learns its description; later ones only fill its slot in
+        the value store. Sensors without a slot, such as unknown BTP3 sensor
+        types, have no description either; their values are only counted.
+        """
+        if (index := SLOT_INDEX.get(key)) is None:
+            self.metrics.readings_unknown += 1
+            return
+        if self.values.described[index]:
+            self.values.set(index, native_value)
             return
-        if sensor_value in ("OPN", "NBO"):
-            _LOGGER.info(
-                "Sensor %s is %s, no update",
-                self._get_sensor_name(sensor_type),
-                format(sensor_value),
-            )
-            sensor_available = False
-
-        if sensor_available is True:
-            try:
-                sensor_value = int(sensor_value)
-            except Exception:  # noqa: BLE001
-                sensor_available = False
-
-        sensor_device_class = None
-        if sensor_type == 13:
-            sensor_value = round(sensor_value / 10, 2)
-            sensor_measurement_unit = "V"
-            sensor_device_class = "VOLTAGE"
-        if 6 < sensor_type < 11:
-            sensor_measurement_unit = "DEGREE"
-            sensor_device_class = "TEMPERATURE"
-
         self.update_sensor(
-            key=self._get_sensor_name(sensor_type),
-            native_unit_of_measurement=sensor_measurement_unit,
-            native_value=sensor_value if sensor_available is True else None,
-            device_class=sensor_device_class,
+            key=key,
+            native_unit_of_measurement=native_unit_of_measurement,
+            native_value=native_value,
+            device_class=device_class,
         )
+        self._announce = True
+        self.values.described[index] = 1
+        self.values.values[index] = native_value
+
+    def _set_signal_strength(self, rssi: int) -> None:
+        """Set the signal strength sensor."""
+        if self.values.described[SIGNAL_STRENGTH_INDEX]:
+            self.values.set(SIGNAL_STRENGTH_INDEX, rssi)
+            return
+        self.update_signal_strength(rssi)
+        self._announce = True
+        self.values.described[SIGNAL_STRENGTH_INDEX] = 1
+        self.values.values[SIGNAL_STRENGTH_INDEX] = rssi
+
+    def _coach_owner(self, data: BluetoothServiceInfo) -> GarnetBluetoothDeviceData:
+        """Return the device owning the coach this advertisement belongs to."""
+        for manufacturer_id, payload in data.manufacturer_data.items():
+            if (spec := REGISTRY.get(manufacturer_id, payload)) is not None:
+                return self.coaches.owner(
+                    (manufacturer_id, spec.coach_id(payload)), self
+                )
+        return self
+
+    def _is_duplicate(
+        self, data: BluetoothServiceInfo, address: str | None = None
+    ) -> bool:
+        """Return True if every Garnet payload matches the last one seen.
+
+        The payload bytes are the fingerprint, keyed by address (the
+        advertisement's unless given) and manufacturer id. A repeat older
+        than DEDUP_MAX_AGE is let through so the signal strength and title
+        are refreshed now and then.
+        """
+        now = monotonic_time_coarse()
+        address = address or data.address
+        seen = changed = False
+        for manufacturer_id, payload in data.manufacturer_data.items():
+            if manufacturer_id not in REGISTRY.manufacturer_ids:
+                continue
+            seen = True
+            key = (address, manufacturer_id)
+            cached = self._fingerprints.get(key)
+            if (
+                cached is None
+                or cached[0] != payload
+                or now - cached[1] >= DEDUP_MAX_AGE
+            ):
+                self._fingerprints[key] = (payload, now)
+                changed = True
+        return seen and not changed
 
-    def _process_update_btp7(self, data: bytes) -> None:
+    def _start_update(self, data: BluetoothServiceInfo) -> None:
         """Update from BLE advertisement data."""
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        if debug:
+            _LOGGER.debug("Parsing Garnet BLE advertisement data: %s", data)
+
+        if self.address is None:
+            self.address = data.address
+            self._set_metadata()
+        self._changed = False
+        self.values.changed.clear()
+
+        registry = REGISTRY
+        for manufacturer_id, data_bytes in data.manufacturer_data.items():
+            spec = registry.get(manufacturer_id, data_bytes)
+            if spec is None and manufacturer_id not in registry.manufacturer_ids:
+                continue
+            if debug:
+                _LOGGER.debug(
+                    "Raw Garnet Manufacturer Data %s",
+                    {key: value.hex() for key, value in data.manufacturer_data.items()},
+                )
+            self.metrics.frames_received[manufacturer_id] += 1
+            timestamp = self.last_seen = time.time()
+            if self.recorder is not None:
+                self.recorder.append(
+                    timestamp, data.address, manufacturer_id, data_bytes
+                )
+            if spec is None:
+                self.metrics.frames_wrong_length += 1
+                readings = ()
+            else:
+                if self.model != spec.model:
+                    self.model = spec.model
+                    self._set_metadata()
+                    self._changed = True
+                readings = self._process_frame(spec, data_bytes, debug)
+            self.history.append(
+                FrameRecord(
+                    timestamp, data.address, manufacturer_id, data_bytes, readings
+                )
+            )
 
-        (
-            coach_id,
-            fresh_1,
-            grey_1,
-            black_1,
-            fresh_2,
-            grey_2,
-            black_2,
-            unk_4,
-            lpg_1,
-            voltage,
-            unk_6,
-            unk_7,
-        ) = unpack("<HxBBBBBBBBBBB", data)
-
-        #        coach_id = int.from_bytes(coach_id, byteorder="little")
-        #        sensor_type = int.from_bytes(sensor_type, byteorder="little")
-        #        sensor_value = sensor_value.decode("utf-8")
-        #        sensor_measurement_unit = "%"
-        #        sensor_available = True
-
-        _LOGGER.debug(
-            "Got coach_id %d fresh1 %d, grey1 %d, black1 %d, fresh2 %d, grey2 %d, black2 %d, voltage %d, lpg1 %d",
-            coach_id,
-            fresh_1,
-            grey_1,
-            black_1,
-            fresh_2,
-            grey_2,
-            black_2,
-            voltage,
-            lpg_1,
-        )
-
-        self.update_sensor(
-            key=GarnetTypes.GREY_TANK,
-            native_unit_of_measurement="%",
-            native_value=grey_1 if (grey_1 not in {110, 102}) else None,
-        )
-
-        self.update_sensor(
-            key=GarnetTypes.GREY_TANK2,
-            native_unit_of_measurement="%",
-            native_value=grey_2 if (grey_2 not in {110, 102}) else None,
-        )
-        #        self.update_sensor(
-        #            key=GarnetTypes.GREY_TANK3,
-        #            native_unit_of_measurement="%",
-        #            native_value=grey_3 if (grey_2 not in {110, 102}) else None,
-        #        )
-
-        self.update_sensor(
-            key=GarnetTypes.FRESH_TANK,
-            native_unit_of_measurement="%",
-            native_value=fresh_1 if (fresh_1 not in {110, 102}) else None,
-        )
-
-        self.update_sensor(
-            key=GarnetTypes.FRESH_TANK2,
-            native_unit_of_measurement="%",
-            native_value=fresh_2 if (fresh_2 not in {110, 102}) else None,
-        )
-
-        self.update_sensor(
-            key=GarnetTypes.BLACK_TANK,
-            native_unit_of_measurement="%",
-            native_value=black_1 if (black_1 not in {110, 102}) else None,
-        )
-
-        self.update_sensor(
-            key=GarnetTypes.BLACK_TANK2,
-            native_unit_of_measurement="%",
-            native_value=black_2 if (black_2 not in {110, 102}) else None,
-        )
-
-        self.update_sensor(
-            key=GarnetTypes.BATTERY,
-            native_unit_of_measurement="V",
-            native_value=round(voltage / 10, 2),
-            device_class="VOLTAGE",
-        )
-
-        self.update_sensor(
-            key=GarnetTypes.LPG_TANK,
-            native_unit_of_measurement="%",
-            native_value=lpg_1 if (lpg_1 not in {110, 102}) else None,
+    def _set_metadata(self) -> None:
+        """Set the title and device info; only needed when the model changes."""
+        name = f"{self.manufacturer} {self.model} {short_address(self.address)}"
+        self.set_title(name)
+        self.set_device_name(name)
+        self.set_device_type(self.model)
+        self.set_device_manufacturer(self.manufacturer)
+        self._announce = True
+
+    def _process_frame(
+        self, spec: FrameSpec, data: bytes, debug: bool
+    ) -> Sequence[Reading]:
+        """Update sensors from one frame and return what it decoded to."""
+        coach_id, readings = spec.decode(data, self._notices)
+        self.coach_id = coach_id
+        if debug:
+            _LOGGER.debug("Got coach_id %d readings %s", coach_id, readings)
+        if not readings:
+            self.metrics.frames_boot += 1
+            return readings
+        seen = self.seen
+        unavailable = 0
+        for channel, value in readings:
+            if value is None:
+                unavailable += 1
+            if seen is not None:
+                seen(channel.key)
+        if unavailable:
+            self.metrics.readings_unavailable += unavailable
+            if unavailable == len(readings):
+                self.metrics.frames_unavailable += 1
+        now = monotonic_time_coarse()
+        if self.rates is not None:
+            self._derive(readings, now)
+        if self.statistics is not None:
+            self._aggregate(readings)
+        published = readings
+        if self.coalesce_window is not None and isinstance(spec, MultiplexedFrameSpec):
+            published = self._coalesce(spec, readings, now)
+        throttle = self.throttle
+        calibration = self.calibration
+        for channel, value in published:
+            if throttle is not None and not throttle.allow(channel.key, value, now):
+                continue
+            self._changed = True
+            self._set_value(channel.key, channel.unit, value, channel.device_class)
+            if calibration is not None and channel.key in calibration.tables:
+                self._set_value(
+                    f"{channel.key}_calibrated_volume",
+                    calibration.unit,
+                    calibration.volume(channel.key, value),
+                )
+        return readings
+
+    def _derive(self, readings: Sequence[Reading], now: float) -> None:
+        """Update the rate sensors derived from a frame's readings.
+
+        Like the readings they come from, they go through the throttle.
+        """
+        rates = self.rates
+        throttle = self.throttle
+        for channel, value in readings:
+            if value is None:
+                continue
+            for key, unit, derived in rates.add(channel.key, value, now):
+                if throttle is not None and not throttle.allow(key, derived, now):
+                    continue
+                self._changed = True
+                self._set_value(key, unit, derived)
+
+    def _aggregate(self, readings: Sequence[Reading]) -> None:
+        """Add a frame's readings of the Garnet sensor types to the statistics."""
+        statistics = self.statistics
+        now = time.time()
+        for channel, value in readings:
+            index = SLOT_INDEX.get(channel.key, GARNET_TYPE_SLOTS)
+            if value is not None and index < GARNET_TYPE_SLOTS:
+                statistics.add(index, value, now)
+
+    def _publish_metrics(self) -> None:
+        """Add the parser metric sensors to an outgoing update now and then."""
+        now = monotonic_time_coarse()
+        if now - self._metrics_published < METRICS_INTERVAL:
+            return
+        self._metrics_published = now
+        metrics = self.metrics
+        self._set_value(
+            "frames_received", None, sum(metrics.frames_received.values())
         )
+        self._set_value("frames_dropped", None, metrics.frames_dropped)
+        self._set_value("updates_emitted", None, metrics.updates_emitted)
+        for percentile in (50, 99):
+            self._set_value(
+                f"parse_time_p{percentile}",
+                "μs",
+                metrics.parse_time_percentile(percentile),
+            )
 
+    def _coalesce(
+        self, spec: FrameSpec, readings: Sequence[Reading], now: float
+    ) -> list[Reading]:
+        """Collect round-robin readings and return them once per rotation."""
+        if (table := self.channel_tables.get(spec)) is None:
+            table = self.channel_tables[spec] = ChannelTable(
+                self.coalesce_window
+            )
+        published: list[Reading] = []
+        for channel, value in readings:
+            published.extend(table.add(channel, value, now))
+        return published
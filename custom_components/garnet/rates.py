@@ -0,0 +1,138 @@
+"""Incremental rate estimates for tank levels and battery voltage.
+
+Each series keeps an exponentially weighted least squares fit of value
+against time. Adding a sample decays and shifts five running sums, so the
+cost per sample is constant and no history is stored.
+"""
+
+from __future__ import annotations
+
+import math
+
+from .const import GarnetTypes
+from .readings import TANK_TYPES
+
+# Level jumps of this many percent are taken as a refill or pump out and
+# restart the fit
+LEVEL_JUMP = 20
+# Rates below this (%/h) are treated as steady; no time estimate is given
+MIN_RATE = 0.1
+# Samples needed, and span as a share of the window, before a rate is given
+MIN_SAMPLES = 3
+MIN_SPAN = 0.25
+
+Derived = tuple[str, str | None, "float | None"]
+
+
+class TrendEstimator:
+    """Exponentially weighted linear regression of a value over time.
+
+    Sample weights decay with a time constant of ``window`` seconds. Times
+    are kept relative to the latest sample, so the sums stay small.
+    """
+
+    __slots__ = (
+        "window",
+        "last_time",
+        "last_value",
+        "first_time",
+        "samples",
+        "_w",
+        "_t",
+        "_y",
+        "_tt",
+        "_ty",
+    )
+
+    def __init__(self, window: float) -> None:
+        """Init members."""
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self.last_time: float | None = None
+        self.last_value = 0.0
+        self.first_time = 0.0
+        self.samples = 0
+        self._w = self._t = self._y = self._tt = self._ty = 0.0
+
+    def add(self, now: float, value: float) -> None:
+        """Add a sample taken at ``now`` (seconds)."""
+        if self.last_time is None:
+            self.first_time = now
+        else:
+            dt = now - self.last_time
+            if dt < 0:
+                return
+            decay = math.exp(-dt / self.window)
+            w, t, y = self._w, self._t, self._y
+            # Move the time origin to now, then decay
+            self._tt = decay * (self._tt - 2 * dt * t + dt * dt * w)
+            self._ty = decay * (self._ty - dt * y)
+            self._t = decay * (t - dt * w)
+            self._w = decay * w
+            self._y = decay * y
+        self._w += 1
+        self._y += value
+        self.last_time = now
+        self.last_value = value
+        self.samples += 1
+
+    def slope(self) -> float | None:
+        """Return the fitted change per second, or None without enough data."""
+        if (
+            self.samples < MIN_SAMPLES
+            or self.last_time - self.first_time < self.window * MIN_SPAN
+        ):
+            return None
+        denominator = self._w * self._tt - self._t * self._t
+        if denominator <= 0:
+            return None
+        return (self._w * self._ty - self._t * self._y) / denominator
+
+
+class RateTracker:
+    """Derive tank fill rates, time to empty or full and the voltage trend."""
+
+    def __init__(self, window: float) -> None:
+        """Init members."""
+        self.window = window
+        self._estimators: dict[str, TrendEstimator] = {}
+
+    def add(self, key: str, value: float, now: float) -> tuple[Derived, ...]:
+        """Add a reading and return the derived sensors it updates."""
+        if key == GarnetTypes.BATTERY:
+            trend = self._estimator(key)
+            trend.add(now, value)
+            return (("battery_trend", "V/h", _per_hour(trend.slope(), 3)),)
+        if key not in TANK_TYPES:
+            return ()
+        trend = self._estimator(key)
+        if trend.samples and abs(value - trend.last_value) >= LEVEL_JUMP:
+            trend.reset()
+        trend.add(now, value)
+        rate = _per_hour(trend.slope(), 1)
+        to_empty = to_full = None
+        if rate is not None and rate <= -MIN_RATE:
+            to_empty = round(value / -rate, 1)
+        elif rate is not None and rate >= MIN_RATE:
+            to_full = round((100 - value) / rate, 1)
+        return (
+            (f"{key}_rate", "%/h", rate),
+            (f"{key}_time_to_empty", "h", to_empty),
+            (f"{key}_time_to_full", "h", to_full),
+        )
+
+    def _estimator(self, key: str) -> TrendEstimator:
+        """Return the estimator of a series, creating it on first use."""
+        if (trend := self._estimators.get(key)) is None:
+            trend = self._estimators[key] = TrendEstimator(self.window)
+        return trend
+
+
+def _per_hour(slope: float | None, digits: int) -> float | None:
+    """Convert a per second slope to a rounded hourly rate."""
+    if slope is None:
+        return None
+    return round(slope * 3600, digits)
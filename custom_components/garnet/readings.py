@@ -0,0 +1,78 @@
+"""Compact store for the latest decoded values of a device."""
+
+from __future__ import annotations
+
+from .const import GarnetTypes
+
+# Diagnostic sensors kept next to the Garnet sensor types
+DIAGNOSTIC_KEYS = (
+    "signal_strength",
+    "frames_received",
+    "frames_dropped",
+    "updates_emitted",
+    "parse_time_p50",
+    "parse_time_p99",
+)
+
+_NOT_TANKS = frozenset(
+    {
+        GarnetTypes.TEMP,
+        GarnetTypes.TEMP_2,
+        GarnetTypes.TEMP_3,
+        GarnetTypes.TEMP_4,
+        GarnetTypes.BATTERY,
+    }
+)
+TANK_TYPES = tuple(
+    garnet_type for garnet_type in GarnetTypes if garnet_type not in _NOT_TANKS
+)
+
+# Sensors derived from the level and voltage history
+RATE_KEYS = (
+    *(
+        f"{tank}_{suffix}"
+        for tank in TANK_TYPES
+        for suffix in ("rate", "time_to_empty", "time_to_full")
+    ),
+    "battery_trend",
+)
+
+# BTP3 volume fields and volumes from a configured calibration
+VOLUME_KEYS = tuple(
+    f"{tank}_{suffix}"
+    for tank in TANK_TYPES
+    for suffix in ("volume", "total", "calibrated_volume")
+)
+
+# Slots are the GarnetTypes ordinals followed by the other sensors
+SLOT_KEYS: tuple[str, ...] = (
+    *GarnetTypes,
+    *DIAGNOSTIC_KEYS,
+    *RATE_KEYS,
+    *VOLUME_KEYS,
+)
+SLOT_INDEX = {key: index for index, key in enumerate(SLOT_KEYS)}
+
+
+class ReadingStore:
+    """Latest value of every known sensor in a preallocated list.
+
+    ``described`` flags the slots whose sensor has been announced to Home
+    Assistant; after that a new value only overwrites its slot and records
+    the index in ``changed``, which the parser clears at the start of every
+    update.
+    """
+
+    __slots__ = ("values", "described", "changed")
+
+    def __init__(self) -> None:
+        """Init members."""
+        self.values: list[int | float | None] = [None] * len(SLOT_KEYS)
+        self.described = bytearray(len(SLOT_KEYS))
+        self.changed: list[int] = []
+
+    def set(self, index: int, value: int | float | None) -> None:
+        """Store a value, noting the slot if it changed."""
+        if self.values[index] != value:
+            self.values[index] = value
+            self.changed.append(index)
@@ -0,0 +1,113 @@
+"""Raw advertisement recorder backed by a memory-mapped ring file.
+
+The file starts with a small header followed by fixed-size slots. Writing a
+frame packs it into the next slot of the mapping and bumps the record count
+in the header; the kernel writes the pages back to disk, so appending never
+formats strings or waits on the disk from the event loop.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import mmap
+import os
+from struct import Struct
+
+from .capture import CaptureRecord
+
+MAGIC = b"GRNR"
+VERSION = 1
+
+# magic, version, slot size, slot count, records written
+HEADER = Struct("<4sHHIQ")
+PAYLOAD_SIZE = 31
+# timestamp, address, manufacturer id, payload length, payload
+SLOT = Struct(f"<d6sHB{PAYLOAD_SIZE}s")
+COUNT = Struct("<Q")
+COUNT_OFFSET = 12
+
+_UNKNOWN_ADDRESS = bytes(6)
+
+
+class RawRecorder:
+    """Append raw advertisements to a fixed-size ring file."""
+
+    def __init__(self, mm: mmap.mmap, slots: int, count: int) -> None:
+        """Init members."""
+        self._mm = mm
+        self._slots = slots
+        self._count = count
+        self._addresses: dict[str, bytes] = {}
+
+    @classmethod
+    def open(cls, path: str, slots: int) -> RawRecorder:
+        """Open or create the ring file; does blocking I/O."""
+        size = HEADER.size + slots * SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        magic, version, slot_size, slot_count, count = HEADER.unpack_from(mm)
+        if (magic, version, slot_size, slot_count) != (
+            MAGIC,
+            VERSION,
+            SLOT.size,
+            slots,
+        ):
+            count = 0
+            HEADER.pack_into(mm, 0, MAGIC, VERSION, SLOT.size, slots, count)
+        return cls(mm, slots, count)
+
+    def append(
+        self, timestamp: float, address: str, manufacturer_id: int, payload: bytes
+    ) -> None:
+        """Record one advertisement."""
+        if (address_bytes := self._addresses.get(address)) is None:
+            address_bytes = self._addresses[address] = _address_to_bytes(address)
+        SLOT.pack_into(
+            self._mm,
+            HEADER.size + (self._count % self._slots) * SLOT.size,
+            timestamp,
+            address_bytes,
+            manufacturer_id,
+            min(len(payload), PAYLOAD_SIZE),
+            payload,
+        )
+        self._count += 1
+        COUNT.pack_into(self._mm, COUNT_OFFSET, self._count)
+
+    def snapshot(self) -> bytes:
+        """Return a copy of the ring for exporting."""
+        return self._mm[:]
+
+    def close(self) -> None:
+        """Flush and unmap the ring file; does blocking I/O."""
+        self._mm.flush()
+        self._mm.close()
+
+
+def _address_to_bytes(address: str) -> bytes:
+    """Pack a MAC address; other address formats are stored as zeros."""
+    try:
+        address_bytes = bytes.fromhex(address.replace(":", ""))
+    except ValueError:
+        return _UNKNOWN_ADDRESS
+    return address_bytes if len(address_bytes) == 6 else _UNKNOWN_ADDRESS
+
+
+def read_ring(data: bytes) -> Iterator[CaptureRecord]:
+    """Yield the records of a ring snapshot, oldest first."""
+    magic, version, slot_size, slots, count = HEADER.unpack_from(data)
+    if (magic, version, slot_size) != (MAGIC, VERSION, SLOT.size):
+        raise ValueError("Not a Garnet raw recorder file")
+    first = max(count - slots, 0)
+    for index in range(first, count):
+        timestamp, address, manufacturer_id, length, payload = SLOT.unpack_from(
+            data, HEADER.size + (index % slots) * SLOT.size
+        )
+        yield CaptureRecord(
+            timestamp, address.hex(":").upper(), manufacturer_id, payload[:length]
+        )
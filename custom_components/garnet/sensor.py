@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import dataclasses
 import logging
-from typing import Optional, Union
+from typing import Any
+
+from sensor_state_data import (  # type: ignore  # noqa: PGH003
+    DeviceKey,
+    SensorUpdate,
+)
 
 from homeassistant import config_entries
 from homeassistant.components.bluetooth.passive_update_processor import (
     PassiveBluetoothDataProcessor,
     PassiveBluetoothDataUpdate,
+    PassiveBluetoothEntityKey,
     PassiveBluetoothProcessorCoordinator,
     PassiveBluetoothProcessorEntity,
 )
@@ -18,13 +25,16 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime, UnitOfVolume
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.sensor import sensor_device_info_to_hass_device_info
 
 from .const import DOMAIN, GarnetTypes
 from .device import device_key_to_bluetooth_entity_key
+from .models import GarnetData
+from .readings import SLOT_INDEX, SLOT_KEYS, TANK_TYPES, ReadingStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -82,6 +92,40 @@ SENSOR_DESCRIPTIONS = {
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
     ),
+    "frames_received": SensorEntityDescription(
+        key="frames_received",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "frames_dropped": SensorEntityDescription(
+        key="frames_dropped",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "updates_emitted": SensorEntityDescription(
+        key="updates_emitted",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "parse_time_p50": SensorEntityDescription(
+        key="parse_time_p50",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MICROSECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "parse_time_p99": SensorEntityDescription(
+        key="parse_time_p99",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MICROSECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
     GarnetTypes.LPG_2_TANK: SensorEntityDescription(
         key=GarnetTypes.LPG_2_TANK,
         device_class=None,
@@ -127,31 +171,153 @@ SENSOR_DESCRIPTIONS = {
         device_class=None,
         native_unit_of_measurement="%",
     ),
+    "battery_trend": SensorEntityDescription(
+        key="battery_trend",
+        native_unit_of_measurement="V/h",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
 }
+for _tank in TANK_TYPES:
+    SENSOR_DESCRIPTIONS[f"{_tank}_rate"] = SensorEntityDescription(
+        key=f"{_tank}_rate",
+        native_unit_of_measurement="%/h",
+        state_class=SensorStateClass.MEASUREMENT,
+    )
+    for _estimate in ("time_to_empty", "time_to_full"):
+        SENSOR_DESCRIPTIONS[f"{_tank}_{_estimate}"] = SensorEntityDescription(
+            key=f"{_tank}_{_estimate}",
+            device_class=SensorDeviceClass.DURATION,
+            native_unit_of_measurement=UnitOfTime.HOURS,
+        )
+    for _field in ("volume", "total"):
+        SENSOR_DESCRIPTIONS[f"{_tank}_{_field}"] = SensorEntityDescription(
+            key=f"{_tank}_{_field}",
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+    SENSOR_DESCRIPTIONS[f"{_tank}_calibrated_volume"] = SensorEntityDescription(
+        key=f"{_tank}_calibrated_volume",
+        device_class=SensorDeviceClass.VOLUME_STORAGE,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        state_class=SensorStateClass.MEASUREMENT,
+    )
 
 
-def sensor_update_to_bluetooth_data_update(sensor_update) -> PassiveBluetoothDataUpdate:
-    """Convert a sensor update to a bluetooth data update."""
-    return PassiveBluetoothDataUpdate(
-        devices={
-            device_id: sensor_device_info_to_hass_device_info(device_info)
-            for device_id, device_info in sensor_update.devices.items()
-        },
-        entity_descriptions={
-            device_key_to_bluetooth_entity_key(device_key): SENSOR_DESCRIPTIONS[
-                description.device_key.key
-            ]
-            for device_key, description in sensor_update.entity_descriptions.items()
-        },
-        entity_data={
-            device_key_to_bluetooth_entity_key(device_key): sensor_values.native_value
-            for device_key, sensor_values in sensor_update.entity_values.items()
-        },
-        entity_names={
-            device_key_to_bluetooth_entity_key(device_key): sensor_values.name
-            for device_key, sensor_values in sensor_update.entity_values.items()
-        },
-    )
+# Handed to the processors when nothing changed; never modified
+_NO_CHANGES: PassiveBluetoothDataUpdate = PassiveBluetoothDataUpdate()
+
+
+class SensorUpdateDeltaConverter:
+    """Convert parser updates to bluetooth data updates holding only changes.
+
+    Device info, entity descriptions and names are sent the first time they
+    are seen; after that only entity values that differ from the previous
+    update are passed on. Values the parser keeps in its store are taken
+    from the slots it marked as changed.
+    """
+
+    def __init__(
+        self,
+        values: ReadingStore,
+        descriptions: dict[str, SensorEntityDescription] = SENSOR_DESCRIPTIONS,
+    ) -> None:
+        """Init members."""
+        self._store = values
+        self._descriptions = descriptions
+        self._slot_entity_keys = tuple(
+            PassiveBluetoothEntityKey(key, None) for key in SLOT_KEYS
+        )
+        self._devices: dict[str | None, tuple[str | None, ...]] = {}
+        self._entity_keys: dict[DeviceKey, PassiveBluetoothEntityKey] = {}
+        self._values: dict[DeviceKey, Any] = {}
+
+    def __call__(
+        self, sensor_update: SensorUpdate | ReadingStore
+    ) -> PassiveBluetoothDataUpdate:
+        """Convert a parser update to a bluetooth data update."""
+        store = self._store
+        if sensor_update is store:
+            if not store.changed:
+                return _NO_CHANGES
+            update = PassiveBluetoothDataUpdate()
+        elif sensor_update.devices or sensor_update.entity_values:
+            update = self._convert(sensor_update)
+        else:
+            return _NO_CHANGES
+        entity_data = update.entity_data
+        entity_keys = self._slot_entity_keys
+        values = store.values
+        for index in store.changed:
+            entity_data[entity_keys[index]] = values[index]
+        return update
+
+    def _convert(self, sensor_update: SensorUpdate) -> PassiveBluetoothDataUpdate:
+        """Convert the new parts of a sensor update."""
+        update = PassiveBluetoothDataUpdate()
+        for device_id, device_info in sensor_update.devices.items():
+            # The parser changes its device info in place, so keep a copy
+            fields = dataclasses.astuple(device_info)
+            if self._devices.get(device_id) != fields:
+                self._devices[device_id] = fields
+                update.devices[device_id] = sensor_device_info_to_hass_device_info(
+                    device_info
+                )
+        values = self._values
+        for device_key, sensor_values in sensor_update.entity_values.items():
+            native_value = sensor_values.native_value
+            if (entity_key := self._entity_keys.get(device_key)) is None:
+                entity_key = self._entity_keys[device_key] = (
+                    device_key_to_bluetooth_entity_key(device_key)
+                )
+                update.entity_descriptions[entity_key] = self._descriptions[
+                    device_key.key
+                ]
+                update.entity_names[entity_key] = sensor_values.name
+            elif device_key in values and values[device_key] == native_value:
+                continue
+            values[device_key] = native_value
+            update.entity_data[entity_key] = native_value
+        return update
+
+
+class GarnetBluetoothDataProcessor(PassiveBluetoothDataProcessor):
+    """Data processor sharing the parser's value store.
+
+    It also knows which of its entities went stale and whether another
+    device publishes its coach. Home Assistant saves the processor's data
+    when it stops and hands it back on registration, so entities are
+    created with their last values before the first frame.
+    """
+
+    def __init__(
+        self,
+        values: ReadingStore,
+        stale: set[PassiveBluetoothEntityKey],
+        descriptions: dict[str, SensorEntityDescription] = SENSOR_DESCRIPTIONS,
+    ) -> None:
+        """Init members."""
+        super().__init__(SensorUpdateDeltaConverter(values, descriptions))
+        self.values = values
+        self.stale = stale
+        self.handed_over = False
+
+    @callback
+    def async_register_coordinator(
+        self,
+        coordinator: PassiveBluetoothProcessorCoordinator,
+        entity_description_class: type[EntityDescription] | None,
+    ) -> None:
+        """Register a coordinator and fill empty slots with restored values.
+
+        Restored slots are marked described, as their entities exist.
+        """
+        super().async_register_coordinator(coordinator, entity_description_class)
+        values = self.values.values
+        described = self.values.described
+        for entity_key, value in self.entity_data.items():
+            index = SLOT_INDEX.get(entity_key.key)
+            if index is not None and values[index] is None:
+                values[index] = value
+                described[index] = 1
 
 
 async def async_setup_entry(
@@ -160,27 +326,69 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Garnet BLE sensors."""
-    coordinator: PassiveBluetoothProcessorCoordinator = hass.data[DOMAIN][
-        entry.entry_id
-    ]
-    processor = PassiveBluetoothDataProcessor(sensor_update_to_bluetooth_data_update)
+    garnet_data: GarnetData = hass.data[DOMAIN][entry.entry_id]
+    coordinator: PassiveBluetoothProcessorCoordinator = garnet_data.coordinator
+    descriptions = SENSOR_DESCRIPTIONS
+    if (calibration := garnet_data.device.calibration) is not None:
+        descriptions = SENSOR_DESCRIPTIONS | {
+            key: dataclasses.replace(
+                SENSOR_DESCRIPTIONS[key],
+                native_unit_of_measurement=calibration.unit,
+            )
+            for key in (f"{tank}_calibrated_volume" for tank in calibration.tables)
+        }
+    processor = GarnetBluetoothDataProcessor(
+        garnet_data.device.values, garnet_data.stale, descriptions
+    )
+    garnet_data.processors.append(processor)
+    entry.async_on_unload(lambda: garnet_data.processors.remove(processor))
     entry.async_on_unload(
         processor.async_add_entities_listener(
             GarnetBluetoothSensorEntity, async_add_entities
         )
     )
-    entry.async_on_unload(coordinator.async_register_processor(processor))
+    entry.async_on_unload(
+        coordinator.async_register_processor(processor, SensorEntityDescription)
+    )
 
 
 class GarnetBluetoothSensorEntity(
-    PassiveBluetoothProcessorEntity[
-        PassiveBluetoothDataProcessor[Optional[Union[float, int]], 1]  # noqa: UP007
-    ],
+    PassiveBluetoothProcessorEntity[GarnetBluetoothDataProcessor],
     SensorEntity,
 ):
     """Representation of a Garnet sensor."""
 
+    def __init__(
+        self,
+        processor: GarnetBluetoothDataProcessor,
+        entity_key: PassiveBluetoothEntityKey,
+        description: SensorEntityDescription,
+        context: Any = None,
+    ) -> None:
+        """Init members."""
+        super().__init__(processor, entity_key, description, context)
+        self._slot = SLOT_INDEX.get(entity_key.key)
+
+    @property
+    def available(self) -> bool:
+        """Return False while stale or published through another device."""
+        processor = self.processor
+        return (
+            super().available
+            and not processor.handed_over
+            and self.entity_key not in processor.stale
+        )
+
     @property
     def native_value(self) -> int | float | None:
-        """Return the native value."""
+        """Return the native value.
+
+        Slots are empty until restored data is copied into them, which is
+        after the restored entities are added; their values are also in the
+        processor's data.
+        """
+        if self._slot is not None and (
+            value := self.processor.values.values[self._slot]
+        ) is not None:
+            return value
         return self.processor.entity_data.get(self.entity_key)
@@ -0,0 +1,139 @@
+"""Services for the Garnet integration."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .capture import write_capture
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_FILENAME,
+    DOMAIN,
+    SERVICE_EXPORT_RAW_FRAMES,
+    SERVICE_GET_SNAPSHOT,
+)
+from .models import GarnetData
+from .recorder import read_ring
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_RAW_FRAMES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FILENAME, default="garnet_capture.jsonl"): vol.Match(
+            r"^[\w.-]+$"
+        ),
+    }
+)
+
+GET_SNAPSHOT_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+
+@callback
+def async_get_snapshot(
+    hass: HomeAssistant, entry_id: str | None = None
+) -> dict[str, Any]:
+    """Return the latest readings of every loaded Garnet device, or of one."""
+    entries: dict[str, GarnetData] = hass.data.get(DOMAIN, {})
+    if entry_id is not None:
+        if entry_id not in entries:
+            raise HomeAssistantError(f"Config entry {entry_id} is not loaded")
+        entries = {entry_id: entries[entry_id]}
+    entries_by_id = hass.config_entries.async_get_entry
+    return {
+        "devices": {
+            entry_id: {
+                "title": entry.title if (entry := entries_by_id(entry_id)) else None,
+                **garnet_data.snapshot(),
+            }
+            for entry_id, garnet_data in entries.items()
+        }
+    }
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/snapshot",
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+    }
+)
+@callback
+def websocket_snapshot(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Send the latest readings of every loaded Garnet device, or of one."""
+    try:
+        snapshot = async_get_snapshot(hass, msg.get(ATTR_CONFIG_ENTRY_ID))
+    except HomeAssistantError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(err))
+        return
+    connection.send_result(msg["id"], snapshot)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Garnet services."""
+
+    async def async_export_raw_frames(call: ServiceCall) -> None:
+        """Export recorded raw frames as a capture in the config directory."""
+        entries: dict[str, GarnetData] = hass.data.get(DOMAIN, {})
+        if (entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID)) is not None:
+            if entry_id not in entries:
+                raise HomeAssistantError(f"Config entry {entry_id} is not loaded")
+            entries = {entry_id: entries[entry_id]}
+        snapshots = [
+            garnet_data.recorder.snapshot()
+            for garnet_data in entries.values()
+            if garnet_data.recorder is not None
+        ]
+        if not snapshots:
+            raise HomeAssistantError("Raw frame recording is not enabled")
+        path = hass.config.path(call.data[ATTR_FILENAME])
+        count = await hass.async_add_executor_job(_write_snapshots, path, snapshots)
+        _LOGGER.info("Exported %d raw frames to %s", count, path)
+
+    @callback
+    def async_get_snapshot_service(call: ServiceCall) -> ServiceResponse:
+        """Return the latest readings of every loaded Garnet device, or of one."""
+        return async_get_snapshot(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_RAW_FRAMES,
+        async_export_raw_frames,
+        schema=EXPORT_RAW_FRAMES_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SNAPSHOT,
+        async_get_snapshot_service,
+        schema=GET_SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    websocket_api.async_register_command(hass, websocket_snapshot)
+
+
+def _write_snapshots(path: str, snapshots: list[bytes]) -> int:
+    """Write ring snapshots to a capture file ordered by time."""
+    records = sorted(
+        (record for snapshot in snapshots for record in read_ring(snapshot)),
+        key=lambda record: record.timestamp,
+    )
+    with open(path, "w", encoding="utf-8") as fp:
+        return write_capture(fp, records)
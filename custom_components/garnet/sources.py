@@ -0,0 +1,72 @@
+"""Choosing one receiver per device when several hear it."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .const import SOURCE_HYSTERESIS, SOURCE_RSSI_WEIGHT, SOURCE_STALE
+
+
+class SourceStats:
+    """Rolling signal strength and frame counts of one receiver."""
+
+    __slots__ = ("rssi", "last_seen", "frames", "dropped")
+
+    def __init__(self, rssi: float, now: float) -> None:
+        """Init members."""
+        self.rssi = rssi
+        self.last_seen = now
+        self.frames = 0
+        self.dropped = 0
+
+
+class SourceArbiter:
+    """Prefer one receiver of a device and drop the copies the others hear.
+
+    Every source keeps an exponentially weighted RSSI. The preferred source
+    only changes when it has not been heard for SOURCE_STALE seconds or
+    another source's RSSI beats it by SOURCE_HYSTERESIS dB, so receivers
+    with similar signal do not take turns.
+    """
+
+    def __init__(self) -> None:
+        """Init members."""
+        self.preferred: SourceStats | None = None
+        self.preferred_source: str | None = None
+        self.sources: dict[str, SourceStats] = {}
+
+    def accept(self, source: str, rssi: int, now: float) -> bool:
+        """Record a frame heard by a source; return False to drop it."""
+        if (stats := self.sources.get(source)) is None:
+            stats = self.sources[source] = SourceStats(rssi, now)
+        stats.frames += 1
+        stats.rssi += (rssi - stats.rssi) * SOURCE_RSSI_WEIGHT
+        stats.last_seen = now
+        preferred = self.preferred
+        if stats is preferred:
+            return True
+        if (
+            preferred is None
+            or now - preferred.last_seen > SOURCE_STALE
+            or stats.rssi > preferred.rssi + SOURCE_HYSTERESIS
+        ):
+            self.preferred = stats
+            self.preferred_source = source
+            return True
+        stats.dropped += 1
+        return False
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the preferred source and per source figures for diagnostics."""
+        return {
+            "preferred": self.preferred_source,
+            "sources": {
+                source: {
+                    "rssi": round(stats.rssi, 1),
+                    "frames": stats.frames,
+                    "dropped": stats.dropped,
+                    "last_seen_seconds_ago": round(now - stats.last_seen, 1),
+                }
+                for source, stats in self.sources.items()
+            },
+        }
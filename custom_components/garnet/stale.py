@@ -0,0 +1,143 @@
+"""Per-channel staleness tracking.
+
+Every channel gets a deadline when it is heard from. Deadlines of all
+devices live in one heap served by a single event loop timer, so hundreds
+of channels cost one pending timer. Extending a deadline only updates a
+dict; the heap entry is moved when it comes due, which happens at most once
+per expiry period for a channel that keeps reporting.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Mapping
+import heapq
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CONF_STALE_LPG,
+    CONF_STALE_TANK,
+    CONF_STALE_TEMPERATURE,
+    CONF_STALE_VOLTAGE,
+    DEFAULT_STALE,
+    GarnetTypes,
+)
+from .frames import REGISTRY, Channel
+
+_LPG_KEYS = frozenset({GarnetTypes.LPG_TANK, GarnetTypes.LPG_2_TANK})
+
+
+def _expiry_option(channel: Channel) -> str:
+    """Return the option holding the expiry for a channel."""
+    if channel.device_class == "VOLTAGE":
+        return CONF_STALE_VOLTAGE
+    if channel.device_class == "TEMPERATURE":
+        return CONF_STALE_TEMPERATURE
+    if channel.key in _LPG_KEYS:
+        return CONF_STALE_LPG
+    return CONF_STALE_TANK
+
+
+def channel_expiries(options: Mapping[str, Any]) -> dict[str, float]:
+    """Return the expiry in seconds of every channel that has one set."""
+    expiries: dict[str, float] = {}
+    for spec in REGISTRY:
+        for channel in spec.channels:
+            if channel is None:
+                continue
+            if expiry := options.get(_expiry_option(channel), DEFAULT_STALE):
+                expiries[channel.key] = float(expiry)
+    return expiries
+
+
+class StaleTracker:
+    """Mark channels stale when they are not heard from in time."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init members."""
+        self._loop = hass.loop
+        self._owners: dict[
+            str, tuple[dict[str, float], Callable[[set[str], bool], None]]
+        ] = {}
+        self._deadlines: dict[tuple[str, str], float] = {}
+        self._heap: list[tuple[float, str, str]] = []
+        self._stale: set[tuple[str, str]] = set()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def register(
+        self,
+        owner: str,
+        expiries: dict[str, float],
+        on_change: Callable[[set[str], bool], None],
+    ) -> Callable[[], None]:
+        """Track an owner's channels; ``on_change`` gets keys and staleness."""
+        self._owners[owner] = (expiries, on_change)
+
+        @callback
+        def _unregister() -> None:
+            del self._owners[owner]
+            for entry in [entry for entry in self._deadlines if entry[0] == owner]:
+                del self._deadlines[entry]
+            self._stale = {entry for entry in self._stale if entry[0] != owner}
+            if not self._owners:
+                self._heap.clear()
+                self._schedule()
+
+        return _unregister
+
+    @callback
+    def touch(self, owner: str, key: str) -> None:
+        """Push back the deadline of a channel that was just heard from."""
+        if (registration := self._owners.get(owner)) is None:
+            return
+        expiries, on_change = registration
+        if (expiry := expiries.get(key)) is None:
+            return
+        entry = (owner, key)
+        deadline = self._loop.time() + expiry
+        had_deadline = entry in self._deadlines
+        self._deadlines[entry] = deadline
+        if had_deadline:
+            return
+        self._push(deadline, owner, key)
+        if entry in self._stale:
+            self._stale.discard(entry)
+            on_change({key}, False)
+
+    def _push(self, deadline: float, owner: str, key: str) -> None:
+        """Add a deadline to the heap and move the timer up if needed."""
+        heapq.heappush(self._heap, (deadline, owner, key))
+        if self._heap[0][0] == deadline:
+            self._schedule()
+
+    def _schedule(self) -> None:
+        """Arm the timer for the earliest deadline."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._heap:
+            self._timer = self._loop.call_at(self._heap[0][0], self._expire)
+
+    @callback
+    def _expire(self) -> None:
+        """Mark the channels whose deadline passed as stale."""
+        now = self._loop.time()
+        heap = self._heap
+        expired: dict[str, set[str]] = {}
+        while heap and heap[0][0] <= now:
+            _, owner, key = heapq.heappop(heap)
+            entry = (owner, key)
+            if (deadline := self._deadlines.get(entry)) is None:
+                continue
+            if deadline > now:
+                heapq.heappush(heap, (deadline, owner, key))
+                continue
+            del self._deadlines[entry]
+            self._stale.add(entry)
+            expired.setdefault(owner, set()).add(key)
+        self._schedule()
+        for owner, keys in expired.items():
+            self._owners[owner][1](keys, True)
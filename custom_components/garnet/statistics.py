@@ -0,0 +1,102 @@
+"""Long-term statistics written by the integration itself."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+import time
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    valid_statistic_id,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util, slugify
+
+from .aggregates import StatisticsAggregator
+from .const import DOMAIN
+from .readings import SLOT_KEYS
+from .sensor import SENSOR_DESCRIPTIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StatisticsWriter:
+    """Write the closed hours of an aggregator as external statistics.
+
+    Each sensor type becomes the statistic ``garnet:<address>_<key>`` with
+    an hourly mean, minimum and maximum. The address is slugified; sensor
+    types whose id is still not valid are not imported.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        aggregator: StatisticsAggregator,
+        address: str,
+        title: str,
+    ) -> None:
+        """Init members."""
+        self.hass = hass
+        self.aggregator = aggregator
+        self._object_prefix = slugify(address.replace(":", ""))
+        self._title = title
+        self._metadata: dict[int, StatisticMetaData | None] = {}
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Write closed hours shortly after every hour; returns the stop callback."""
+        return async_track_utc_time_change(
+            self.hass, self.async_flush, minute=0, second=30
+        )
+
+    @callback
+    def async_flush(self, now: datetime | None = None) -> None:
+        """Write the hours closed since the last flush."""
+        rows: dict[int, list[StatisticData]] = {}
+        for start, index, mean, minimum, maximum in self.aggregator.flush(
+            time.time()
+        ):
+            rows.setdefault(index, []).append(
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(start),
+                    mean=mean,
+                    min=minimum,
+                    max=maximum,
+                )
+            )
+        for index, statistics in rows.items():
+            if (metadata := self._statistic_metadata(index)) is not None:
+                async_add_external_statistics(self.hass, metadata, statistics)
+
+    def _statistic_metadata(self, index: int) -> StatisticMetaData | None:
+        """Return the metadata of a slot's statistic, None if its id is invalid."""
+        if index in self._metadata:
+            return self._metadata[index]
+        key = SLOT_KEYS[index]
+        statistic_id = f"{DOMAIN}:{self._object_prefix}_{key}"
+        if not valid_statistic_id(statistic_id):
+            _LOGGER.warning(
+                "Not importing statistics of %s, %s is not a valid statistic id",
+                self._title,
+                statistic_id,
+            )
+            self._metadata[index] = None
+            return None
+        unit = SENSOR_DESCRIPTIONS[key].native_unit_of_measurement
+        metadata = self._metadata[index] = StatisticMetaData(
+            mean_type=StatisticMeanType.ARITHMETIC,
+            has_sum=False,
+            name=f"{self._title} {key.replace('_', ' ').title()}",
+            source=DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement=unit or None,
+        )
+        return metadata
@@ -0,0 +1,76 @@
+"""Publish throttling for Garnet readings."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
+    CONF_HEARTBEAT,
+    CONF_MIN_INTERVAL,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBAND_PERCENT,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_MIN_INTERVAL,
+)
+
+
+class PublishThrottle:
+    """Decide per sensor whether a new reading is worth publishing.
+
+    A reading is held back if it arrives sooner than ``min_interval`` after
+    the last published one, or if it is within the absolute or percent
+    deadband of it. Once ``heartbeat`` seconds pass without a publish the
+    next reading always goes through. Changes to or from unavailable are
+    never held back. Zero disables the respective setting.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        deadband: float = DEFAULT_DEADBAND,
+        deadband_percent: float = DEFAULT_DEADBAND_PERCENT,
+        heartbeat: float = DEFAULT_HEARTBEAT,
+    ) -> None:
+        """Init members."""
+        self.min_interval = min_interval
+        self.deadband = deadband
+        self.deadband_ratio = deadband_percent / 100
+        self.heartbeat = heartbeat
+        self._published: dict[str, tuple[int | float | None, float]] = {}
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> PublishThrottle | None:
+        """Create a throttle from config entry options, None if all disabled."""
+        throttle = cls(
+            options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            options.get(CONF_DEADBAND, DEFAULT_DEADBAND),
+            options.get(CONF_DEADBAND_PERCENT, DEFAULT_DEADBAND_PERCENT),
+            options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+        )
+        if not (throttle.min_interval or throttle.deadband or throttle.deadband_ratio):
+            return None
+        return throttle
+
+    def allow(self, key: str, value: int | float | None, now: float) -> bool:
+        """Return True if the reading should be published, and record it."""
+        if (last := self._published.get(key)) is not None:
+            last_value, last_time = last
+            if (value is None) is (last_value is None):
+                elapsed = now - last_time
+                if not (self.heartbeat and elapsed >= self.heartbeat):
+                    if elapsed < self.min_interval:
+                        return False
+                    if value is None or self._within_deadband(value, last_value):
+                        return False
+        self._published[key] = (value, now)
+        return True
+
+    def _within_deadband(self, value: int | float, last_value: int | float) -> bool:
+        """Return True if the change from the last published value is too small."""
+        delta = abs(value - last_value)
+        return delta <= self.deadband or delta <= self.deadband_ratio * abs(
+            last_value
+        )
@@ -0,0 +1,70 @@
+"""Benchmarks of the frame decoders and the parser.
+
+Run with pytest-benchmark, e.g. ``pytest tests/test_benchmarks.py``; pass
+``--benchmark-compare`` against a saved run to catch regressions.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from home_assistant_bluetooth import BluetoothServiceInfo
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.conformance import VECTORS
+from benchmarks.parser import SCENARIOS, synthetic_btp7
+from custom_components.garnet.capture import CaptureRecord
+from custom_components.garnet.frames import REGISTRY, FrameSpec
+from custom_components.garnet.parser import GarnetBluetoothDeviceData
+
+FRAMES = 2000
+DEVICES = 10
+
+Update = Callable[[BluetoothServiceInfo], Any]
+
+
+@pytest.mark.parametrize("spec", list(REGISTRY), ids=lambda spec: spec.model)
+def test_decode(benchmark: BenchmarkFixture, spec: FrameSpec) -> None:
+    """Decode the captured frames of a spec."""
+    payloads = [payload for payload, _, _ in VECTORS[spec.model]]
+    decode = spec.decode
+
+    def decode_all() -> None:
+        for payload in payloads:
+            decode(payload)
+
+    benchmark(decode_all)
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_parse(benchmark: BenchmarkFixture, scenario: str) -> None:
+    """Parse a synthetic capture with fresh per-address parsers each round."""
+    records: list[CaptureRecord] = SCENARIOS[scenario](FRAMES, DEVICES)
+    infos = [record.to_service_info() for record in records]
+
+    def setup() -> tuple[tuple[list[Update]], dict[str, Any]]:
+        devices: dict[str, GarnetBluetoothDeviceData] = {}
+        updates = [
+            devices.setdefault(info.address, GarnetBluetoothDeviceData()).update
+            for info in infos
+        ]
+        return (updates,), {}
+
+    def parse_all(updates: list[Update]) -> None:
+        for update, info in zip(updates, infos, strict=True):
+            update(info)
+
+    benchmark.extra_info["frames"] = len(infos)
+    benchmark.pedantic(parse_all, setup=setup, rounds=20)
+
+
+def test_dedup(benchmark: BenchmarkFixture) -> None:
+    """Drop a repeat of the last frame, the common case of a busy gateway."""
+    info = synthetic_btp7(1, 1)[0].to_service_info()
+    device = GarnetBluetoothDeviceData()
+    device.update(info)
+    device.update(info)
+    frames_duplicate = device.metrics.frames_duplicate
+
+    benchmark(device.update, info)
+    assert device.metrics.frames_duplicate > frames_duplicate
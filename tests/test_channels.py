@@ -0,0 +1,65 @@
+"""Tests for the rotation coalescing of multiplexed channels."""
+
+from custom_components.garnet.channels import STALE_ROTATIONS, ChannelTable
+from custom_components.garnet.frames import BTP3
+
+FRESH, BLACK, GREY = BTP3.channels[:3]
+
+
+def test_rotation_closes_when_first_channel_returns() -> None:
+    """A rotation is published once its first channel comes back."""
+    table = ChannelTable()
+    assert table.add(FRESH, 66, 0) == []
+    assert table.add(GREY, 20, 1) == []
+    assert table.add(BLACK, 10, 2) == []
+    assert table.add(FRESH, 67, 3) == [(FRESH, 66), (GREY, 20), (BLACK, 10)]
+    assert table.rotation == 1
+
+
+def test_repeated_channel_does_not_close_rotations() -> None:
+    """A channel sent several times in a row only updates its pending value."""
+    table = ChannelTable()
+    for now, channel in enumerate((FRESH, GREY, BLACK)):
+        table.add(channel, 50, now)
+    published = []
+    for now, value in enumerate((66, 67, 66), start=3):
+        published += table.add(FRESH, value, now)
+    assert table.rotation == 1
+    published += table.add(GREY, 21, 6)
+    published += table.add(BLACK, 11, 7)
+    published += table.add(FRESH, 68, 8)
+    assert table.rotation == 2
+    assert (GREY, None) not in published
+    assert (BLACK, None) not in published
+    assert published[-3:] == [(FRESH, 66), (GREY, 21), (BLACK, 11)]
+
+
+def test_dwelling_channel_keeps_others_fresh() -> None:
+    """Repeats close at most one rotation per as many frames as channels."""
+    table = ChannelTable()
+    for now, channel in enumerate((FRESH, GREY, BLACK)):
+        table.add(channel, 50, now)
+    published = []
+    for now, value in enumerate((66, 67, 66, 67, 66, 67), start=3):
+        published += table.add(FRESH, value, now)
+    assert table.rotation <= STALE_ROTATIONS
+    assert not [reading for reading in published if reading[1] is None]
+
+
+def test_single_channel_panel_still_publishes() -> None:
+    """A panel sending one channel closes a rotation with every frame."""
+    table = ChannelTable()
+    assert table.add(FRESH, 66, 0) == []
+    assert table.add(FRESH, 67, 1) == [(FRESH, 66)]
+
+
+def test_missing_channel_goes_stale() -> None:
+    """A channel gone for STALE_ROTATIONS rotations is published as None."""
+    table = ChannelTable()
+    table.add(FRESH, 66, 0)
+    table.add(GREY, 20, 1)
+    published = []
+    # With two channels known, a rotation of FRESH alone takes two frames
+    for now in range(2, 2 * STALE_ROTATIONS + 5):
+        published += table.add(FRESH, 66, now)
+    assert (GREY, None) in published
@@ -0,0 +1,92 @@
+"""Property tests of the frame decoders and the parser with malformed frames."""
+
+from hypothesis import given, strategies as st
+
+from benchmarks.fuzz import ASCII_FIELDS
+from custom_components.garnet.capture import CaptureRecord
+from custom_components.garnet.frames import BTP3, BTP7, REGISTRY, FrameSpec
+from custom_components.garnet.parser import GarnetBluetoothDeviceData
+from custom_components.garnet.readings import SLOT_INDEX
+from custom_components.garnet.sensor import SensorUpdateDeltaConverter
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+specs = st.sampled_from(list(REGISTRY))
+coach_ids = st.binary(min_size=3, max_size=3)
+value_fields = st.one_of(
+    st.sampled_from(ASCII_FIELDS), st.binary(min_size=3, max_size=3)
+)
+
+
+@st.composite
+def frames(draw: st.DrawFn) -> tuple[FrameSpec, bytes]:
+    """Return a spec with a payload of its length, random or built from fields."""
+    spec = draw(specs)
+    if spec is BTP3 and draw(st.booleans()):
+        payload = (
+            draw(coach_ids)
+            + bytes((draw(st.integers(0, 255)),))
+            + b"".join(draw(value_fields) for _ in range(3))
+        )
+        rest = spec.length - len(payload)
+        payload += draw(st.binary(min_size=rest, max_size=rest))
+    else:
+        payload = draw(st.binary(min_size=spec.length, max_size=spec.length))
+    return spec, payload
+
+
+def btp3_frame(sensor_type: int, value: bytes) -> bytes:
+    """Return a BTP3 payload with the given sensor type and value field."""
+    return b"\x34\x12\x00" + bytes((sensor_type,)) + value + b"      \x00"
+
+
+def parse(manufacturer_id: int, payloads: list[bytes]) -> GarnetBluetoothDeviceData:
+    """Run payloads through a parser and the sensor converter."""
+    device = GarnetBluetoothDeviceData()
+    converter = SensorUpdateDeltaConverter(device.values)
+    for timestamp, payload in enumerate(payloads):
+        record = CaptureRecord(timestamp, ADDRESS, manufacturer_id, payload)
+        converter(device.update(record.to_service_info()))
+    return device
+
+
+@given(frames())
+def test_decode_never_raises(frame: tuple[FrameSpec, bytes]) -> None:
+    """Any payload of a spec's length decodes to numbers or None."""
+    spec, payload = frame
+    coach_id, readings = spec.decode(payload)
+    assert coach_id == spec.coach_id(payload)
+    for _, value in readings:
+        assert value is None or type(value) in (int, float)
+
+
+@given(specs, st.lists(st.binary(max_size=20), max_size=10))
+def test_parser_never_raises(spec: FrameSpec, payloads: list[bytes]) -> None:
+    """Payloads of any length go through the parser and converter."""
+    parse(spec.manufacturer_id, payloads)
+
+
+@given(st.integers(0, len(BTP3.channels) - 1), st.sampled_from((b"OPN", b"NBO")))
+def test_unavailable_values_decode_to_none(sensor_type: int, value: bytes) -> None:
+    """OPN and NBO make any BTP3 channel, the battery included, None."""
+    _, readings = BTP3.decode(btp3_frame(sensor_type, value))
+    assert readings == ((BTP3.channels[sensor_type], None),)
+
+
+@given(st.integers(len(BTP3.channels), BTP3.boot_type - 1), value_fields)
+def test_unknown_sensor_types_publish_nothing(sensor_type: int, value: bytes) -> None:
+    """Unknown BTP3 sensor types are counted but fill no slot."""
+    device = parse(BTP3.manufacturer_id, [btp3_frame(sensor_type, value)])
+    assert device.metrics.readings_unknown == 1
+    assert not any(device.values.described[: SLOT_INDEX["signal_strength"]])
+
+
+@given(st.binary(min_size=BTP7.length, max_size=BTP7.length))
+def test_btp7_sentinels_decode_to_none(payload: bytes) -> None:
+    """Tank levels of an open or missing sender decode to None."""
+    fields = BTP7.layout.unpack(payload)
+    _, readings = BTP7.decode(payload)
+    values = dict(readings)
+    for index, channel in enumerate(BTP7.channels, start=1):
+        if channel is not None and fields[index] in channel.sentinels:
+            assert values[channel] is None
@@ -0,0 +1,46 @@
+"""Tests for the Garnet parser."""
+
+import pytest
+
+from custom_components.garnet.capture import CaptureRecord
+from custom_components.garnet.parser import GarnetBluetoothDeviceData
+from custom_components.garnet.rates import RateTracker
+from custom_components.garnet.readings import SLOT_INDEX
+from custom_components.garnet.throttle import PublishThrottle
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+def btp7_frame(fresh: int, timestamp: float = 0) -> CaptureRecord:
+    """Return a BTP7 advertisement with the given fresh tank level."""
+    payload = bytes.fromhex(f"341200{fresh:02x}21106e46170066847f00")
+    return CaptureRecord(timestamp, ADDRESS, 0x0CC0, payload)
+
+
+def test_rates_go_through_the_throttle(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Derived rates are held back like the readings they come from."""
+    now = [0.0]
+    monkeypatch.setattr(
+        "custom_components.garnet.parser.monotonic_time_coarse", lambda: now[0]
+    )
+    device = GarnetBluetoothDeviceData(
+        throttle=PublishThrottle(min_interval=3600), rates=RateTracker(600)
+    )
+    # Recomputed from every frame while the tank drains
+    to_empty = SLOT_INDEX["fresh_tank_time_to_empty"]
+    published = 0
+    for level in range(60, 40, -1):
+        now[0] += 60
+        device.update(btp7_frame(level).to_service_info())
+        published += to_empty in device.values.changed
+    assert published == 1
+
+
+def test_unavailable_frames_are_dropped() -> None:
+    """A BTP3 frame reporting OPN or NBO counts as dropped."""
+    device = GarnetBluetoothDeviceData()
+    for index, value in enumerate((b"OPN", b"NBO", b" 67")):
+        payload = b"\x34\x12\x00\x00" + value + b"      \x00"
+        device.update(CaptureRecord(index, ADDRESS, 0x0131, payload).to_service_info())
+    assert device.metrics.frames_unavailable == 2
+    assert device.metrics.frames_dropped == 2